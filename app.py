@@ -1,13 +1,17 @@
 from datetime import date, datetime, timezone
 from calendar import monthrange
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, flash, session
+import click
+from flask import Flask, Request, render_template, request, jsonify, send_file, redirect, url_for, flash, session, g
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_mail import Mail, Message
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_options_header
 from pymongo import MongoClient
 from bson.objectid import ObjectId
 import io
 import zipfile
+import hashlib
 import base64
 import os
 import sqlite3
@@ -17,14 +21,31 @@ import requests
 import tempfile
 import subprocess
 import shutil
+import json
+import time
+import mimetypes
+import threading
+import mmap
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from dotenv import load_dotenv
 import re
+import gc
+import math
+import codecs
+import itertools
+import csv
+import atexit
+from urllib.parse import urlparse
 from datetime import timedelta
+from typing import Optional
 
 try:
-    from PIL import Image
+    from PIL import Image, ImageColor
 except Exception:  # Pillow optional for image tools
     Image = None
+    ImageColor = None
 try:
     import PyPDF2
 except Exception:  # PyPDF2 optional for PDF tools
@@ -46,9 +67,13 @@ try:
 except Exception:
     SpellChecker = None
 try:
-    import speedtest  # speedtest-cli
+    import resource  # Unix only, used for worker memory reporting
 except Exception:
-    speedtest = None
+    resource = None
+try:
+    import fcntl  # Unix only, used for the cross-process ffmpeg slot locks
+except Exception:
+    fcntl = None
 
 
 # Load environment variables
@@ -102,6 +127,69 @@ except Exception as e:
 DB_PATH = os.path.join(os.path.dirname(__file__), "data.db")
 
 
+class TTLCache:
+    """Thread-safe, size-bounded LRU mapping whose entries expire after `ttl` seconds."""
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.data.get(key, self._MISSING)
+            if entry is not self._MISSING and entry[0] > now:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not self._MISSING:
+                del self.data[key]
+            self.misses += 1
+            return default
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, self._MISSING) is not self._MISSING
+
+    def set(self, key, value) -> None:
+        with self.lock:
+            self.data[key] = (time.monotonic() + self.ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self.lock:
+            self.data.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.data),
+                "maxSize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Users are loaded on every authenticated request; keep them briefly in-process.
+# Writes below invalidate this worker's copy, other workers catch up within the TTL.
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10_000))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 30))
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
 # User Model
 class User(UserMixin):
     def __init__(self, user_data):
@@ -121,11 +209,18 @@ class User(UserMixin):
     def get(user_id):
         if users_collection is None:
             return None
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
         try:
             user_data = users_collection.find_one({'_id': ObjectId(user_id)})
-            return User(user_data) if user_data else None
         except:
             return None
+        if not user_data:
+            return None
+        user = User(user_data)
+        user_cache.set(user_id, user)
+        return user
 
     @staticmethod
     def get_by_email(email):
@@ -182,6 +277,7 @@ class User(UserMixin):
                 {'_id': ObjectId(self.id)},
                 {'$set': {'is_verified': True}, '$unset': {'verification_token': 1}}
             )
+            user_cache.pop(self.id)
             self.is_verified = True
 
 
@@ -190,6 +286,11 @@ def load_user(user_id):
     return User.get(user_id)
 
 
+@app.get("/api/users/cache-stats")
+def api_user_cache_stats():
+    return jsonify(user_cache.stats())
+
+
 def send_verification_email(user, token):
     """Send email verification"""
     if not app.config['MAIL_USERNAME'] or not app.config['MAIL_PASSWORD']:
@@ -280,24 +381,144 @@ def send_password_reset_email(user, token):
         return False
 
 
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+_db_local = threading.local()
+
+
+def get_db() -> sqlite3.Connection:
+    """Return this thread's long-lived connection to data.db, opening it on first use."""
+    conn = getattr(_db_local, "conn", None)
+    # A connection inherited across a gunicorn fork must not be reused by the child
+    if conn is None or _db_local.pid != os.getpid():
+        conn = sqlite3.connect(DB_PATH, timeout=10, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        _db_local.conn = conn
+        _db_local.pid = os.getpid()
+    return conn
+
+
 def init_db() -> None:
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True) if os.path.dirname(DB_PATH) else None
-    with sqlite3.connect(DB_PATH) as conn:
+    with get_db() as conn:
+        create_shortener_schema(conn)
+
+
+def create_shortener_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS short_urls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            code TEXT UNIQUE NOT NULL,
+            url TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            url_hash TEXT
+        )
+        """
+    )
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(short_urls)")}
+    if "url_hash" not in columns:
+        conn.execute("ALTER TABLE short_urls ADD COLUMN url_hash TEXT")
+        rows = conn.execute("SELECT id, url FROM short_urls").fetchall()
+        conn.executemany("UPDATE short_urls SET url_hash = ? WHERE id = ?", [(hash_url(url), i) for i, url in rows])
+    has_unique = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_short_urls_url_hash_unique'"
+    ).fetchone()
+    if not has_unique:
+        # Older databases may hold the same URL several times; the oldest row keeps
+        # the hash (and becomes the deduplicated code), the rest stay reachable by code
+        conn.execute("DROP INDEX IF EXISTS idx_short_urls_url_hash")
         conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS short_urls (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                code TEXT UNIQUE NOT NULL,
-                url TEXT NOT NULL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """
+            "UPDATE short_urls SET url_hash = NULL WHERE url_hash IS NOT NULL AND id NOT IN "
+            "(SELECT MIN(id) FROM short_urls WHERE url_hash IS NOT NULL GROUP BY url_hash)"
+        )
+        conn.execute("CREATE UNIQUE INDEX idx_short_urls_url_hash_unique ON short_urls(url_hash)")
+    conn.execute("CREATE TABLE IF NOT EXISTS code_counter (name TEXT PRIMARY KEY, next_id INTEGER NOT NULL)")
+    conn.execute("INSERT OR IGNORE INTO code_counter(name, next_id) VALUES('short_urls', 0)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS short_url_clicks (
+            code TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            referrer TEXT NOT NULL,
+            clicks INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (code, bucket, referrer)
         )
+        """
+    )
+
+
+BASE62_ALPHABET = string.digits + string.ascii_letters
+# Allocated codes are 6 characters, so they can never clash with the 7-character
+# random codes minted before the allocator existed.
+SHORT_CODE_WIDTH = 6
+SHORT_CODE_SPACE = 62 ** SHORT_CODE_WIDTH
+# Affine bijection over the code space; the multiplier is coprime with 62**6.
+# Fixed forever: changing it would map new ids onto codes already handed out.
+_SCRAMBLE_MUL = 21729154149
+_SCRAMBLE_ADD = 56145686323
+CODE_BLOCK_SIZE = int(os.getenv("CODE_BLOCK_SIZE", 1000))
+
+
+def encode_base62(n: int, width: int = 0) -> str:
+    digits = []
+    while n:
+        n, r = divmod(n, 62)
+        digits.append(BASE62_ALPHABET[r])
+    return "".join(reversed(digits)).rjust(width, BASE62_ALPHABET[0])
+
+
+def id_to_code(n: int) -> str:
+    """Encode a numeric id as a unique short code, scrambled so codes aren't sequential."""
+    if n >= SHORT_CODE_SPACE:
+        return encode_base62(n)
+    return encode_base62((n * _SCRAMBLE_MUL + _SCRAMBLE_ADD) % SHORT_CODE_SPACE, SHORT_CODE_WIDTH)
+
+
+class CodeAllocator:
+    """Hand out short codes from numeric id blocks reserved in SQLite.
+
+    Each process reserves CODE_BLOCK_SIZE ids at a time with a single atomic
+    UPDATE, then serves codes from memory, so codes are unique without retries.
+    """
 
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.block_end = 0
+        self.pid = None
 
-def generate_code(length: int = 7) -> str:
-    alphabet = string.ascii_letters + string.digits
-    return "".join(secrets.choice(alphabet) for _ in range(length))
+    def _reserve(self, conn: sqlite3.Connection, count: int) -> None:
+        size = max(self.block_size, count)
+        with conn:
+            conn.execute("UPDATE code_counter SET next_id = next_id + ? WHERE name = 'short_urls'", (size,))
+            end = conn.execute("SELECT next_id FROM code_counter WHERE name = 'short_urls'").fetchone()[0]
+        self.next_id, self.block_end = end - size, end
+
+    def allocate(self, conn: sqlite3.Connection, count: int = 1) -> list[str]:
+        codes = []
+        with self.lock:
+            if self.pid != os.getpid():
+                # Never share a block with the parent after a fork
+                self.next_id = self.block_end = 0
+                self.pid = os.getpid()
+            while len(codes) < count:
+                if self.next_id >= self.block_end:
+                    self._reserve(conn, count - len(codes))
+                take = min(count - len(codes), self.block_end - self.next_id)
+                codes.extend(id_to_code(i) for i in range(self.next_id, self.next_id + take))
+                self.next_id += take
+        return codes
+
+
+code_allocator = CodeAllocator(CODE_BLOCK_SIZE)
+
+
+def hash_url(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
 
 
 def difference_ymd(start_date: date, end_date: date) -> tuple[int, int, int]:
@@ -337,6 +558,42 @@ def months_and_extra_days(start_date: date, end_date: date) -> tuple[int, int]:
     return months_total, extra_days
 
 
+_MONTH_DAYS = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _days_in_month(year: int, month: int) -> int:
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _MONTH_DAYS[month]
+
+
+def date_diff_row(start_date: date, end_date: date) -> tuple[int, int, int, int, int, int]:
+    """Every /api/diff column for one pair (start <= end) in a single pass.
+
+    Returns (years, months, days, total_months, extra_days, total_days), identical
+    to difference_ymd() and months_and_extra_days(): both borrow the month before
+    the end date when the end day is earlier, so they share that arithmetic.
+    """
+    month_span = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
+    days = extra_days = end_date.day - start_date.day
+    if days < 0:
+        month_span -= 1
+        borrow_days = _days_in_month(end_date.year - (end_date.month == 1), end_date.month - 1 or 12)
+        days += borrow_days
+        # add_months() clamps the anchor to the borrowed month's last day
+        extra_days = borrow_days - min(start_date.day, borrow_days) + end_date.day
+    years, months = divmod(month_span, 12)
+    return years, months, days, month_span, extra_days, end_date.toordinal() - start_date.toordinal()
+
+
+def parse_ymd(value) -> date:
+    """Parse Y-M-D as /api/diff always has; zero-padded ISO dates take the C fast path."""
+    value = str(value).strip()
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        return date.fromisoformat(value)
+    return date(*map(int, value.split("-")))
+
+
 # Authentication Routes
 @app.route('/signup', methods=['GET', 'POST'])
 def signup():
@@ -558,6 +815,7 @@ def reset_password(token):
             {'_id': user_data['_id']},
             {'$set': {'password_hash': password_hash}, '$unset': {'reset_token': 1, 'reset_token_expires': 1}}
         )
+        user_cache.pop(str(user_data['_id']))
 
         flash('Password reset successfully! You can now sign in.', 'success')
         return jsonify({'success': True, 'message': 'Password reset successfully!', 'redirect': url_for('signin')}) if request.is_json else redirect(url_for('signin'))
@@ -611,6 +869,7 @@ def update_profile():
         {'_id': ObjectId(current_user.id)},
         {'$set': set_doc}
     )
+    user_cache.pop(current_user.id)
     
     # Update the current user object
     current_user.name = name
@@ -647,6 +906,7 @@ def profile_preferences():
         return jsonify({'success': False, 'error': 'No valid preferences provided'}), 400
 
     users_collection.update_one({'_id': ObjectId(current_user.id)}, {'$set': updates})
+    user_cache.pop(current_user.id)
 
     # Reflect changes in current_user
     if 'preferences.theme' in updates:
@@ -690,6 +950,7 @@ def change_password():
         {'_id': ObjectId(current_user.id)},
         {'$set': {'password_hash': password_hash}}
     )
+    user_cache.pop(current_user.id)
 
     if request.is_json:
         return jsonify({'success': True, 'message': 'Password changed successfully!'})
@@ -745,9 +1006,609 @@ def api_diff():
     })
 
 
+DIFF_BATCH_MAX = int(os.getenv("DIFF_BATCH_MAX", 500_000))
+DIFF_COLUMNS = ("years", "months", "days", "totalMonths", "extraDays", "totalDays")
+DIFF_CSV_COLUMNS = ("years", "months", "days", "total_months", "extra_days", "total_days", "error")
+DATE_LIKE_RE = re.compile(r"\s*\d+-\d+-\d+\s*$")
+
+
+def diff_batch(pairs) -> list:
+    """date_diff_row() over (start, end) strings; a bad row yields its error message."""
+    results = []
+    for start_input, end_input in pairs:
+        try:
+            start_date = parse_ymd(start_input)
+            end_date = parse_ymd(end_input)
+        except (TypeError, ValueError) as ex:
+            results.append(f"Invalid input: {ex}")
+            continue
+        if end_date < start_date:
+            start_date, end_date = end_date, start_date
+        results.append(date_diff_row(start_date, end_date))
+    return results
+
+
+def _csv_column(spec: str, header: Optional[list], default: int) -> int:
+    if not spec:
+        return default
+    if spec.isdigit():
+        return int(spec)
+    if header is None or spec not in header:
+        raise ValueError(f"column {spec!r} not found in the CSV header")
+    return header.index(spec)
+
+
+@app.post("/api/diff/batch")
+def api_diff_batch():
+    """Date differences for many pairs. Accepts JSON {"pairs": [...]} or a CSV (returned with the columns appended)."""
+    upload = request.files.get("file")
+    if upload:
+        rows = list(csv.reader(io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")))
+        rows = [row for row in rows if any(cell.strip() for cell in row)]
+        if not rows:
+            return jsonify({"error": "No date pairs provided"}), 400
+        first = rows[0]
+        try:
+            start_col = _csv_column(request.form.get("startColumn", ""), first, 0)
+            end_col = _csv_column(request.form.get("endColumn", ""), first, 1)
+        except ValueError as ex:
+            return jsonify({"error": str(ex)}), 400
+        # An explicit header=0/1 wins; otherwise row 1 is a header only if its start cell
+        # isn't date-shaped at all, so a bad date in a headerless file is reported, not eaten
+        header_flag = request.form.get("header", "").lower()
+        if header_flag in ("1", "true", "yes"):
+            has_header = True
+        elif header_flag in ("0", "false", "no"):
+            has_header = False
+        else:
+            has_header = start_col >= len(first) or not DATE_LIKE_RE.match(first[start_col])
+        header = rows.pop(0) if has_header else None
+        if not rows:
+            return jsonify({"error": "No date pairs provided"}), 400
+        pairs = [(row[start_col] if start_col < len(row) else "", row[end_col] if end_col < len(row) else "") for row in rows]
+    else:
+        data = request.get_json(force=True, silent=True)
+        items = data.get("pairs") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return jsonify({"error": "pairs must be a list of {startDate, endDate} objects or [start, end] pairs"}), 400
+        pairs = []
+        for item in items:
+            if isinstance(item, dict):
+                pairs.append((item.get("startDate"), item.get("endDate")))
+            elif isinstance(item, list) and len(item) == 2:
+                pairs.append(tuple(item))
+            else:
+                pairs.append((None, None))
+    if not pairs:
+        return jsonify({"error": "No date pairs provided"}), 400
+    if len(pairs) > DIFF_BATCH_MAX:
+        return jsonify({"error": f"At most {DIFF_BATCH_MAX} pairs per batch"}), 413
+    results = diff_batch(pairs)
+    if upload:
+        width = max(len(row) for row in rows)
+        out = io.StringIO()
+        writer = csv.writer(out)
+        names = header or [f"column_{i + 1}" for i in range(width)]
+        writer.writerow(names + [""] * (width - len(names)) + list(DIFF_CSV_COLUMNS))
+        for row, result in zip(rows, results):
+            row = row + [""] * (width - len(row))
+            writer.writerow(row + ([""] * 6 + [result] if isinstance(result, str) else list(result) + [""]))
+        return send_file(io.BytesIO(out.getvalue().encode("utf-8")), mimetype="text/csv", as_attachment=True, download_name="date_differences.csv")
+    return jsonify({
+        "results": [{"error": r} if isinstance(r, str) else dict(zip(DIFF_COLUMNS, r)) for r in results],
+        "errors": sum(isinstance(r, str) for r in results),
+    })
+
+
+@app.cli.command("bench-date-diff")
+@click.option("--rows", default=100_000, show_default=True, help="Random date pairs to compute.")
+@click.option("--seed", default=7, show_default=True)
+def bench_date_diff(rows: int, seed: int):
+    """Time date_diff_row() against the scalar functions and check they agree on every row."""
+    import random
+    rng = random.Random(seed)
+    lo, hi = date(1900, 1, 1).toordinal(), date(2100, 12, 31).toordinal()
+    # Month ends, leap days and same-month pairs are where the borrowing rules differ
+    edges = [date(y, m, _days_in_month(y, m)).toordinal() for y in (1900, 1999, 2000, 2023, 2024) for m in range(1, 13)]
+    pairs = []
+    for _ in range(rows):
+        a = rng.choice(edges) if rng.random() < 0.2 else rng.randint(lo, hi)
+        b = a + rng.randint(0, 62) if rng.random() < 0.3 else rng.randint(lo, hi)
+        pairs.append(tuple(sorted((date.fromordinal(a), date.fromordinal(b)))))
+
+    started = time.perf_counter()
+    expected = [
+        difference_ymd(s, e) + months_and_extra_days(s, e) + ((e - s).days,) for s, e in pairs
+    ]
+    scalar = time.perf_counter() - started
+    started = time.perf_counter()
+    actual = [date_diff_row(s, e) for s, e in pairs]
+    fused = time.perf_counter() - started
+    mismatches = [(p, x, y) for p, x, y in zip(pairs, expected, actual) if x != y]
+    click.echo(f"   scalar: {scalar:.3f}s ({rows / scalar:,.0f} rows/s)")
+    click.echo(f"    fused: {fused:.3f}s ({rows / fused:,.0f} rows/s)")
+    strings = [(s.isoformat(), e.isoformat()) for s, e in pairs]
+    started = time.perf_counter()
+    diff_batch(strings)
+    batch = time.perf_counter() - started
+    click.echo(f"    batch: {batch:.3f}s ({rows / batch:,.0f} rows/s, including parsing)")
+    if mismatches:
+        for pair, want, got in mismatches[:10]:
+            click.echo(f"MISMATCH {pair[0]} -> {pair[1]}: scalar {want}, fused {got}")
+        raise SystemExit(f"{len(mismatches)} of {rows} rows disagree")
+    click.echo(f"All {rows:,} rows match the scalar functions")
+
+
  
 
 
+# ------------------------- Upload Handling -------------------------
+
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", 1024 * 1024))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+MB = 1024 * 1024
+UPLOAD_LIMITS = {
+    "api_pdf_merge": int(os.getenv("UPLOAD_LIMIT_PDF_MERGE", 200 * MB)),
+    "api_pdf_split": int(os.getenv("UPLOAD_LIMIT_PDF", 100 * MB)),
+    "api_pdf_compress": int(os.getenv("UPLOAD_LIMIT_PDF", 100 * MB)),
+    "api_pdf_to_word": int(os.getenv("UPLOAD_LIMIT_PDF", 100 * MB)),
+    "api_pdf_to_excel": int(os.getenv("UPLOAD_LIMIT_PDF", 100 * MB)),
+    "api_convert_image": int(os.getenv("UPLOAD_LIMIT_IMAGE", 50 * MB)),
+    "api_image_bulk": int(os.getenv("UPLOAD_LIMIT_IMAGE_BULK", 200 * MB)),
+    "api_convert_video": int(os.getenv("UPLOAD_LIMIT_VIDEO", 500 * MB)),
+    "api_grammar": int(os.getenv("UPLOAD_LIMIT_GRAMMAR", 20 * MB)),
+    "api_diff_batch": int(os.getenv("UPLOAD_LIMIT_DIFF", 50 * MB)),
+}
+_upload_stats = {}
+_upload_stats_lock = threading.Lock()
+
+
+class SpoolingRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Spool anything but small parts straight to disk so it can be memory-mapped later
+        if total_content_length is None or total_content_length > UPLOAD_SPOOL_THRESHOLD:
+            return tempfile.TemporaryFile("wb+", dir=UPLOAD_SPOOL_DIR)
+        return io.BytesIO()
+
+
+app.request_class = SpoolingRequest
+
+
+def _record_upload(endpoint: str, size: int, rejected: bool = False) -> None:
+    with _upload_stats_lock:
+        stats = _upload_stats.setdefault(endpoint, {"requests": 0, "bytes": 0, "maxBytes": 0, "rejected": 0})
+        if rejected:
+            stats["rejected"] += 1
+            return
+        stats["requests"] += 1
+        stats["bytes"] += size
+        stats["maxBytes"] = max(stats["maxBytes"], size)
+
+
+@app.before_request
+def enforce_upload_limits():
+    limit = UPLOAD_LIMITS.get(request.endpoint)
+    if limit is None or request.environ.get("toolflock.job"):
+        return None
+    size = request.content_length
+    if size is not None and size > limit:
+        # Refuse from the header alone, before the body is read
+        _record_upload(request.endpoint, size, rejected=True)
+        return jsonify({"error": f"Upload too large; the limit for this tool is {limit // MB} MB"}), 413
+    try:
+        request.max_content_length = limit  # Flask 3.1+: also caps chunked bodies
+    except AttributeError:
+        pass
+    _record_upload(request.endpoint, size or 0)
+    return None
+
+
+def read_upload(storage):
+    """Return an upload's contents without copying spooled files into memory.
+
+    Disk-spooled uploads come back as a read-only mmap (closed at teardown), small
+    in-memory ones as bytes. Both support len() and hashing; use as_stream() to
+    hand them to a parser.
+    """
+    stream = storage.stream
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        fd = None
+    if fd is None or os.fstat(fd).st_size == 0:
+        stream.seek(0)
+        return stream.read()
+    stream.flush()
+    view = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    g.setdefault("upload_maps", []).append(view)
+    return view
+
+
+def as_stream(data):
+    if isinstance(data, mmap.mmap):
+        data.seek(0)
+        return data
+    return io.BytesIO(data)
+
+
+@app.teardown_request
+def close_upload_maps(exc=None):
+    for view in g.pop("upload_maps", []):
+        try:
+            view.close()
+        except BufferError:
+            pass
+
+
+@app.get("/api/uploads/stats")
+def api_upload_stats():
+    with _upload_stats_lock:
+        return jsonify({endpoint: dict(stats) for endpoint, stats in _upload_stats.items()})
+
+
+# --------------------------- Result Cache --------------------------
+
+class ResultCache:
+    """Disk-backed LRU cache of tool outputs keyed by upload bytes + parameters."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(tool: str, params: dict, *parts: bytes) -> str:
+        h = hashlib.sha256(tool.encode())
+        h.update(json.dumps(params, sort_keys=True, default=str).encode())
+        for part in parts:
+            h.update(len(part).to_bytes(8, "big"))
+            h.update(part)
+        return h.hexdigest()
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return base + ".bin", base + ".json"
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += n
+
+    def send(self, key: str):
+        """Return a streaming response for a cached artifact, or None on a miss."""
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as fh:
+                meta = json.load(fh)
+            os.utime(data_path)
+            response = send_file(data_path, mimetype=meta["mimetype"], as_attachment=True, download_name=meta["download_name"])
+        except (OSError, ValueError, KeyError):
+            self._count("misses")
+            return None
+        self._count("hits")
+        response.headers.update(meta.get("headers", {}))
+        response.headers["X-Cache"] = "HIT"
+        return response
+
+    def store(self, key: str, payload, mimetype: str, download_name: str, headers: dict = None):
+        """Persist a bytes-like payload or a file path under `key` and return a response serving it."""
+        data_path, meta_path = self._paths(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            if isinstance(payload, str):
+                with open(payload, "rb") as src:
+                    shutil.copyfileobj(src, fh)
+            else:
+                fh.write(payload)
+        with open(meta_path, "w") as fh:
+            json.dump({"mimetype": mimetype, "download_name": download_name, "headers": headers or {}}, fh)
+        os.replace(tmp_path, data_path)
+        self._count("stores")
+        self.evict(keep=data_path)
+        response = send_file(data_path, mimetype=mimetype, as_attachment=True, download_name=download_name)
+        response.headers.update(headers or {})
+        response.headers["X-Cache"] = "MISS"
+        return response
+
+    def evict(self, keep: str = None) -> None:
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".bin"):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            for p in (path, path[:-4] + ".json"):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            total -= size
+            self._count("evictions")
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+result_cache = ResultCache(
+    os.getenv("RESULT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "toolflock-cache")),
+    int(os.getenv("RESULT_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+)
+
+
+def file_sha256(path: str) -> bytes:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+@app.get("/api/cache/stats")
+def api_cache_stats():
+    return jsonify(result_cache.snapshot())
+
+
+# ---------------------------- Job Queue ----------------------------
+
+JOB_DIR = os.getenv("JOB_DIR", os.path.join(tempfile.gettempdir(), "toolflock-jobs"))
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(JOB_DIR, "jobs.db"))
+JOB_WORKERS = max(1, int(os.getenv("JOB_WORKERS", 2)))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 3600))
+JOB_HEARTBEAT_INTERVAL = int(os.getenv("JOB_HEARTBEAT_INTERVAL", 15))
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", 120))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 2))
+ASYNC_JOB_ENDPOINTS = {
+    "api_pdf_merge", "api_pdf_split", "api_pdf_compress", "api_pdf_to_word", "api_pdf_to_excel",
+    "api_image_bulk", "api_convert_video",
+}
+_job_wakeup = threading.Event()
+_job_workers_started = False
+_job_workers_lock = threading.Lock()
+
+
+def _job_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(JOB_DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_jobs_db() -> None:
+    os.makedirs(JOB_DIR, exist_ok=True)
+    with _job_db() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                path TEXT NOT NULL,
+                form TEXT NOT NULL,
+                files TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                progress REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                mimetype TEXT,
+                download_name TEXT,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                heartbeat_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "heartbeat_at" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+
+
+def start_job_workers() -> None:
+    global _job_workers_started
+    with _job_workers_lock:
+        if _job_workers_started:
+            return
+        init_jobs_db()
+        for i in range(JOB_WORKERS):
+            threading.Thread(target=_job_worker_loop, name=f"job-worker-{i}", daemon=True).start()
+        _job_workers_started = True
+
+
+def submit_job() -> str:
+    """Spool the current request to disk and queue it for a background worker."""
+    start_job_workers()
+    job_id = secrets.token_urlsafe(16)
+    job_path = os.path.join(JOB_DIR, job_id)
+    os.makedirs(job_path)
+    files = []
+    for n, (field, storage) in enumerate(request.files.items(multi=True)):
+        path = os.path.join(job_path, f"input_{n}")
+        storage.save(path)
+        files.append([field, storage.filename, storage.mimetype, path])
+    form = [[k, v] for k, v in request.form.items(multi=True) if k != "async"]
+    with _job_db() as conn:
+        conn.execute(
+            "INSERT INTO jobs(id, endpoint, path, form, files, created_at) VALUES(?, ?, ?, ?, ?, ?)",
+            (job_id, request.endpoint, request.path, json.dumps(form), json.dumps(files), time.time()),
+        )
+    _job_wakeup.set()
+    return job_id
+
+
+def report_job_progress(progress: float) -> None:
+    """Record progress (0-100) for the job the current request is running under, if any."""
+    job_id = request.environ.get("toolflock.job")
+    if job_id:
+        with _job_db() as conn:
+            conn.execute("UPDATE jobs SET progress = ? WHERE id = ?", (round(progress, 1), job_id))
+
+
+def _claim_job():
+    with _job_db() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+        if row is None:
+            return None
+        claimed = conn.execute(
+            "UPDATE jobs SET status = 'running', heartbeat_at = ?, attempts = attempts + 1 WHERE id = ? AND status = 'queued'",
+            (time.time(), row["id"]),
+        )
+        return row if claimed.rowcount else None
+
+
+def _job_heartbeat(job_id: str, stop: threading.Event) -> None:
+    # Lets other workers tell a long job from one whose process died mid-run
+    while not stop.wait(JOB_HEARTBEAT_INTERVAL):
+        with _job_db() as conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'", (time.time(), job_id))
+
+
+def reclaim_stale_jobs() -> None:
+    """Requeue running jobs whose worker stopped heartbeating, failing them after JOB_MAX_ATTEMPTS."""
+    now = time.time()
+    cutoff = now - JOB_STALE_AFTER
+    with _job_db() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', progress = 0 WHERE status = 'running' AND heartbeat_at < ? AND attempts < ?",
+            (cutoff, JOB_MAX_ATTEMPTS),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Worker stopped while running the job', finished_at = ? "
+            "WHERE status = 'running' AND heartbeat_at < ?",
+            (now, cutoff),
+        )
+
+
+def _run_job(row) -> None:
+    job_path = os.path.join(JOB_DIR, row["id"])
+    data = MultiDict(json.loads(row["form"]))
+    handles = []
+    stop_heartbeat = threading.Event()
+    threading.Thread(target=_job_heartbeat, args=(row["id"], stop_heartbeat), daemon=True).start()
+    try:
+        for field, filename, mimetype, path in json.loads(row["files"]):
+            fh = open(path, "rb")
+            handles.append(fh)
+            data.add(field, (fh, filename, mimetype))
+        # Replay the original request through the app so async and sync share one code path
+        resp = app.test_client().post(row["path"], data=data, environ_base={"toolflock.job": row["id"]})
+        try:
+            if resp.status_code >= 400:
+                error = (resp.get_json(silent=True) or {}).get("error") or f"HTTP {resp.status_code}"
+                raise RuntimeError(error)
+            result_path = os.path.join(job_path, "result")
+            with open(result_path, "wb") as out:
+                for chunk in resp.response:
+                    out.write(chunk)
+            _, options = parse_options_header(resp.headers.get("Content-Disposition", ""))
+            download_name = options.get("filename", "result")
+        finally:
+            resp.close()
+    except Exception as ex:
+        with _job_db() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (str(ex), time.time(), row["id"]),
+            )
+        return
+    finally:
+        stop_heartbeat.set()
+        for fh in handles:
+            fh.close()
+        for _, _, _, path in json.loads(row["files"]):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    with _job_db() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'done', progress = 100, mimetype = ?, download_name = ?, finished_at = ? WHERE id = ?",
+            (resp.mimetype, download_name, time.time(), row["id"]),
+        )
+
+
+def cleanup_expired_jobs() -> None:
+    cutoff = time.time() - JOB_RESULT_TTL
+    with _job_db() as conn:
+        expired = [r["id"] for r in conn.execute("SELECT id FROM jobs WHERE finished_at < ?", (cutoff,))]
+        conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+    for job_id in expired:
+        shutil.rmtree(os.path.join(JOB_DIR, job_id), ignore_errors=True)
+
+
+def _job_worker_loop() -> None:
+    last_cleanup = 0.0
+    while True:
+        try:
+            if time.time() - last_cleanup > 60:
+                reclaim_stale_jobs()
+                cleanup_expired_jobs()
+                last_cleanup = time.time()
+            row = _claim_job()
+            if row is not None:
+                _run_job(row)
+                continue
+        except Exception as ex:
+            print(f"Job worker error: {ex}")
+        _job_wakeup.wait(timeout=1.0)
+        _job_wakeup.clear()
+
+
+@app.before_request
+def maybe_enqueue_job():
+    if request.endpoint not in ASYNC_JOB_ENDPOINTS or request.environ.get("toolflock.job"):
+        return None
+    # Opt-in only: the tool pages expect the file itself, not a job reference
+    if request.values.get("async", "").lower() not in ("1", "true", "yes"):
+        return None
+    job_id = submit_job()
+    return jsonify({
+        "jobId": job_id,
+        "status": "queued",
+        "statusUrl": url_for("api_job_status", job_id=job_id),
+        "resultUrl": url_for("api_job_result", job_id=job_id),
+    }), 202
+
+
+@app.get("/api/jobs/<job_id>")
+def api_job_status(job_id: str):
+    start_job_workers()
+    with _job_db() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    body = {"jobId": row["id"], "status": row["status"], "progress": row["progress"], "error": row["error"]}
+    if row["status"] == "done":
+        body["resultUrl"] = url_for("api_job_result", job_id=job_id)
+    return jsonify(body)
+
+
+@app.get("/api/jobs/<job_id>/result")
+def api_job_result(job_id: str):
+    start_job_workers()
+    with _job_db() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    if row["status"] != "done":
+        return jsonify({"error": f"Job is {row['status']}", "status": row["status"]}), 409
+    return send_file(os.path.join(JOB_DIR, job_id, "result"), mimetype=row["mimetype"], as_attachment=True, download_name=row["download_name"])
+
+
 # ---------------------------- PDF Tools ----------------------------
 
 @app.get("/pdf")
@@ -762,14 +1623,90 @@ def api_pdf_merge():
     files = request.files.getlist("files")
     if not files:
         return jsonify({"error": "No PDF files uploaded"}), 400
-    merger = PyPDF2.PdfMerger()
-    for f in files:
-        merger.append(io.BytesIO(f.read()))
-    output = io.BytesIO()
-    merger.write(output)
-    merger.close()
-    output.seek(0)
-    return send_file(output, mimetype="application/pdf", as_attachment=True, download_name="merged.pdf")
+    # Optional 1-based upload order ("2,1,3") and per-upload page selections, in upload order
+    order_spec = request.form.get("order", "")
+    ranges = request.form.getlist("ranges")
+    try:
+        order = [int(i) - 1 for i in order_spec.split(",") if i.strip()] or list(range(len(files)))
+        if any(i < 0 or i >= len(files) for i in order):
+            raise ValueError(f"order must reference uploads 1-{len(files)}")
+    except ValueError as ex:
+        return jsonify({"error": f"Invalid order: {ex}"}), 400
+    with tempfile.TemporaryDirectory() as td:
+        # Spool uploads to disk; PdfMerger reads pages from the files lazily
+        paths = []
+        for n, f in enumerate(files):
+            path = os.path.join(td, f"input_{n}.pdf")
+            f.save(path)
+            paths.append(path)
+        key = result_cache.key("pdf/merge", {"order": order, "ranges": ranges}, *[file_sha256(p) for p in paths])
+        cached = result_cache.send(key)
+        if cached:
+            return cached
+        writer = PyPDF2.PdfWriter()
+        handles = []
+        readers = {}
+        try:
+            for i in order:
+                # Parse each upload once. PdfMerger.append() re-parses its input on every
+                # call, which made scattered selections quadratic; PdfWriter uses the reader
+                if i not in readers:
+                    fh = open(paths[i], "rb")
+                    handles.append(fh)
+                    readers[i] = PyPDF2.PdfReader(fh)
+                reader = readers[i]
+                spec = ranges[i] if i < len(ranges) else ""
+                writer.append(reader, pages=parse_page_ranges(spec, len(reader.pages)), import_outline=True)
+            out_path = os.path.join(td, "merged.pdf")
+            with open(out_path, "wb") as out:
+                writer.write(out)
+        except ValueError as ex:
+            return jsonify({"error": f"Invalid page selection for upload {i + 1}: {ex}"}), 400
+        finally:
+            for fh in handles:
+                fh.close()
+        return result_cache.store(key, out_path, "application/pdf", "merged.pdf")
+
+
+def parse_page_ranges(spec: str, page_count: int) -> list[int]:
+    """Turn a selection like "1-3,7,10-" into zero-based page indices."""
+    spec = (spec or "").replace(" ", "")
+    if not spec:
+        return list(range(page_count))
+    indices = []
+    seen = set()
+    for part in spec.split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, _, last = part.partition("-")
+            start = int(first) if first else 1
+            end = int(last) if last else page_count
+        else:
+            start = end = int(part)
+        if start < 1 or end < start or end > page_count:
+            raise ValueError(f"page range '{part}' is outside 1-{page_count}")
+        for i in range(start - 1, end):
+            if i not in seen:
+                seen.add(i)
+                indices.append(i)
+    if not indices:
+        raise ValueError("no pages selected")
+    return indices
+
+
+def chunk_pages(indices: list[int], chunk_size: int) -> list[list[int]]:
+    return [indices[i:i + chunk_size] for i in range(0, len(indices), chunk_size)]
+
+
+def write_pdf_pages(reader, indices: list[int]) -> bytes:
+    # One writer per output so fonts/images shared between its pages are cloned once
+    writer = PyPDF2.PdfWriter()
+    for i in indices:
+        writer.add_page(reader.pages[i])
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
 
 
 @app.post("/api/pdf/split")
@@ -779,38 +1716,228 @@ def api_pdf_split():
     file = request.files.get("file")
     if not file:
         return jsonify({"error": "No PDF uploaded"}), 400
-    reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
+    mode = (request.form.get("mode") or ("chunk" if request.form.get("chunk_size") else "pages")).lower()
+    pages = request.form.get("pages", "")
+    data = read_upload(file)
+    key = result_cache.key("pdf/split", {"mode": mode, "pages": pages, "chunk_size": request.form.get("chunk_size")}, data)
+    cached = result_cache.send(key)
+    if cached:
+        return cached
+    reader = PyPDF2.PdfReader(as_stream(data))
+    try:
+        indices = parse_page_ranges(pages, len(reader.pages))
+        chunk_size = int(request.form.get("chunk_size") or 1)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+    except ValueError as ex:
+        return jsonify({"error": f"Invalid page selection: {ex}"}), 400
+
+    if mode == "extract":
+        return result_cache.store(key, write_pdf_pages(reader, indices), "application/pdf", "extracted_pages.pdf")
+    if mode == "chunk":
+        groups = chunk_pages(indices, chunk_size)
+    elif mode == "pages":
+        groups = [[i] for i in indices]
+    else:
+        return jsonify({"error": "mode must be one of: pages, chunk, extract"}), 400
+
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        for i in range(len(reader.pages)):
-            writer = PyPDF2.PdfWriter()
-            writer.add_page(reader.pages[i])
-            single_buffer = io.BytesIO()
-            writer.write(single_buffer)
-            zf.writestr(f"page_{i+1}.pdf", single_buffer.getvalue())
-    zip_buffer.seek(0)
-    return send_file(zip_buffer, mimetype="application/zip", as_attachment=True, download_name="split_pages.zip")
+        for group in groups:
+            first, last = group[0] + 1, group[-1] + 1
+            name = f"page_{first}.pdf" if len(group) == 1 else f"pages_{first}-{last}.pdf"
+            zf.writestr(name, write_pdf_pages(reader, group))
+    return result_cache.store(key, zip_buffer.getvalue(), "application/zip", "split_pages.zip")
+
+
+PDF_COMPRESSION_PRESETS = {
+    "screen": {"dpi": 72, "quality": 40},
+    "ebook": {"dpi": 150, "quality": 60},
+    "print": {"dpi": 300, "quality": 80},
+}
+
+
+def _dedupe_resource(container, key, seen: dict) -> None:
+    """Point `container[key]` at the first identical stream already seen."""
+    ref = container.raw_get(key)
+    if not isinstance(ref, PyPDF2.generic.IndirectObject):
+        return
+    obj = ref.get_object()
+    if not isinstance(obj, PyPDF2.generic.StreamObject):
+        return
+    digest = obj.hash_value()
+    canonical = seen.setdefault(digest, ref)
+    if canonical.idnum != ref.idnum:
+        container[PyPDF2.generic.NameObject(key)] = canonical
+
+
+def _image_components(obj):
+    cs = obj.get("/ColorSpace")
+    if cs == "/DeviceRGB":
+        return 3
+    if cs == "/DeviceGray":
+        return 1
+    if isinstance(cs, PyPDF2.generic.ArrayObject) and len(cs) == 2 and cs[0] == "/ICCBased":
+        return int(cs[1].get_object().get("/N", 0))
+    return None
+
+
+def _downsample_pdf_image(obj, max_side: int, quality: int) -> bool:
+    """Re-encode an image XObject as a smaller JPEG; returns True if replaced."""
+    if obj.get("/ImageMask") or "/Decode" in obj or isinstance(obj.get("/Mask"), PyPDF2.generic.ArrayObject):
+        return False
+    components = _image_components(obj)
+    if components not in (1, 3) or obj.get("/BitsPerComponent", 8) != 8:
+        return False
+    mode = "RGB" if components == 3 else "L"
+    width, height = int(obj["/Width"]), int(obj["/Height"])
+    flt = obj.get("/Filter")
+    try:
+        if flt == "/DCTDecode":
+            img = Image.open(io.BytesIO(obj._data))
+            img.draft(mode, (max_side, max_side))
+            img = img.convert(mode)
+        elif flt in (None, "/FlateDecode"):
+            img = Image.frombytes(mode, (width, height), obj.get_data())
+        else:
+            return False
+    except Exception:
+        return False
+    scale = max_side / max(img.width, img.height)
+    if scale < 1:
+        img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality, optimize=True)
+    data = buf.getvalue()
+    if len(data) >= len(obj._data):
+        return False
+    obj._data = data
+    obj.decoded_self = None
+    obj[PyPDF2.generic.NameObject("/Filter")] = PyPDF2.generic.NameObject("/DCTDecode")
+    obj[PyPDF2.generic.NameObject("/Width")] = PyPDF2.generic.NumberObject(img.width)
+    obj[PyPDF2.generic.NameObject("/Height")] = PyPDF2.generic.NumberObject(img.height)
+    obj.pop("/DecodeParms", None)
+    return True
 
 
-@app.post("/api/pdf/compress")
-def api_pdf_compress():
-    if PyPDF2 is None:
-        return jsonify({"error": "PyPDF2 not installed"}), 500
-    file = request.files.get("file")
-    if not file:
-        return jsonify({"error": "No PDF uploaded"}), 400
-    reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
+def compress_pdf(data: bytes, dpi: int, quality: int) -> bytes:
+    reader = PyPDF2.PdfReader(as_stream(data))
     writer = PyPDF2.PdfWriter()
+    seen_streams = {}
+    processed = set()
     for page in reader.pages:
+        resources = page.get("/Resources")
+        resources = resources.get_object() if resources is not None else {}
+        xobjects = resources.get("/XObject")
+        if xobjects is not None:
+            xobjects = xobjects.get_object()
+            for name in list(xobjects.keys()):
+                _dedupe_resource(xobjects, name, seen_streams)
+            max_side = int(max(float(page.mediabox.width), float(page.mediabox.height)) / 72 * dpi)
+            for name in list(xobjects.keys()):
+                obj = xobjects[name].get_object()
+                if obj.get("/Subtype") != "/Image" or id(obj) in processed:
+                    continue
+                processed.add(id(obj))
+                _downsample_pdf_image(obj, max_side, quality)
+        fonts = resources.get("/Font")
+        if fonts is not None:
+            for font in fonts.get_object().values():
+                font = font.get_object()
+                for f in [font] + [d.get_object() for d in font.get("/DescendantFonts", [])]:
+                    descriptor = f.get("/FontDescriptor")
+                    if descriptor is None:
+                        continue
+                    descriptor = descriptor.get_object()
+                    for key in ("/FontFile", "/FontFile2", "/FontFile3"):
+                        if key in descriptor:
+                            _dedupe_resource(descriptor, key, seen_streams)
+        # Only objects reachable from the copied pages are written, so unused ones drop out
+        new_page = writer.add_page(page)
         try:
-            page.compress_content_streams()
+            new_page.compress_content_streams()
         except Exception:
             pass
-        writer.add_page(page)
     out = io.BytesIO()
     writer.write(out)
-    out.seek(0)
-    return send_file(out, mimetype="application/pdf", as_attachment=True, download_name="compressed.pdf")
+    result = out.getvalue()
+    return result if len(result) < len(data) else data
+
+
+@app.post("/api/pdf/compress")
+def api_pdf_compress():
+    if PyPDF2 is None:
+        return jsonify({"error": "PyPDF2 not installed"}), 500
+    if Image is None:
+        return jsonify({"error": "Pillow not installed"}), 500
+    file = request.files.get("file")
+    if not file:
+        return jsonify({"error": "No PDF uploaded"}), 400
+    preset = PDF_COMPRESSION_PRESETS.get(request.form.get("preset", "ebook").lower())
+    if preset is None:
+        return jsonify({"error": f"preset must be one of: {', '.join(PDF_COMPRESSION_PRESETS)}"}), 400
+    data = read_upload(file)
+    key = result_cache.key("pdf/compress", preset, data)
+    cached = result_cache.send(key)
+    if cached:
+        return cached
+    result = compress_pdf(data, preset["dpi"], preset["quality"])
+    headers = {
+        "X-Original-Size": str(len(data)),
+        "X-Compressed-Size": str(len(result)),
+        "X-Compression-Ratio": f"{len(result) / len(data):.3f}" if data else "1.000",
+    }
+    return result_cache.store(key, result, "application/pdf", "compressed.pdf", headers)
+
+
+PDF_TEXT_WORKERS = max(1, int(os.getenv("PDF_TEXT_WORKERS", min(4, os.cpu_count() or 1))))
+PDF_TEXT_PARALLEL_MIN_PAGES = int(os.getenv("PDF_TEXT_PARALLEL_MIN_PAGES", 16))
+_text_pool = None
+_text_pool_lock = threading.Lock()
+
+
+def _extract_text_range(source, start: int, end: int) -> list[str]:
+    """Text of pages [start, end) from an upload, or from a file path (in pool workers)."""
+    if isinstance(source, str):
+        # Map the spooled file so every worker shares the page cache instead of a private copy
+        with open(source, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _extract_text_range(mapped, start, end)
+    reader = PyPDF2.PdfReader(as_stream(source))
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def _get_text_pool() -> ProcessPoolExecutor:
+    global _text_pool
+    with _text_pool_lock:
+        if _text_pool is None:
+            _text_pool = ProcessPoolExecutor(max_workers=PDF_TEXT_WORKERS)
+        return _text_pool
+
+
+def extract_pdf_text(data: bytes) -> list[str]:
+    """Extract the text of every page, fanning large documents out across processes."""
+    global _text_pool
+    page_count = len(PyPDF2.PdfReader(as_stream(data)).pages)
+    if PDF_TEXT_WORKERS == 1 or page_count < PDF_TEXT_PARALLEL_MIN_PAGES:
+        return _extract_text_range(data, 0, page_count)
+    step = -(-page_count // (PDF_TEXT_WORKERS * 2))
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    pool = _get_text_pool()
+    # Hand workers a path rather than pickling the whole PDF into every task
+    with tempfile.NamedTemporaryFile("wb", suffix=".pdf", dir=UPLOAD_SPOOL_DIR, delete=False) as spool:
+        spool.write(data)
+    try:
+        futures = [pool.submit(_extract_text_range, spool.name, start, end) for start, end in ranges]
+        return [text for future in futures for text in future.result()]
+    except BrokenProcessPool:
+        # A crashed worker should not fail the request; retry serially and rebuild the pool next time
+        with _text_pool_lock:
+            if _text_pool is pool:
+                _text_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        return _extract_text_range(data, 0, page_count)
+    finally:
+        os.remove(spool.name)
 
 
 @app.post("/api/pdf/to-word")
@@ -820,17 +1947,20 @@ def api_pdf_to_word():
     file = request.files.get("file")
     if not file:
         return jsonify({"error": "No PDF uploaded"}), 400
-    reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
+    data = read_upload(file)
+    key = result_cache.key("pdf/to-word", {}, data)
+    cached = result_cache.send(key)
+    if cached:
+        return cached
+    pages = extract_pdf_text(data)
     document = docx.Document()
-    for i, page in enumerate(reader.pages, start=1):
-        text = page.extract_text() or ""
+    for i, text in enumerate(pages, start=1):
         document.add_heading(f"Page {i}", level=2)
         for line in text.splitlines():
             document.add_paragraph(line)
     out = io.BytesIO()
     document.save(out)
-    out.seek(0)
-    return send_file(out, mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document", as_attachment=True, download_name="converted.docx")
+    return result_cache.store(key, out.getvalue(), "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "converted.docx")
 
 
 @app.post("/api/pdf/to-excel")
@@ -840,13 +1970,18 @@ def api_pdf_to_excel():
     file = request.files.get("file")
     if not file:
         return jsonify({"error": "No PDF uploaded"}), 400
-    reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
+    data = read_upload(file)
+    key = result_cache.key("pdf/to-excel", {}, data)
+    cached = result_cache.send(key)
+    if cached:
+        return cached
+    pages = extract_pdf_text(data)
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "PDF Text"
     row_idx = 1
-    for i, page in enumerate(reader.pages, start=1):
-        text = (page.extract_text() or "").splitlines()
+    for i, page_text in enumerate(pages, start=1):
+        text = page_text.splitlines()
         ws.cell(row=row_idx, column=1, value=f"Page {i}")
         row_idx += 1
         for line in text:
@@ -855,8 +1990,7 @@ def api_pdf_to_excel():
         row_idx += 1
     out = io.BytesIO()
     wb.save(out)
-    out.seek(0)
-    return send_file(out, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", as_attachment=True, download_name="converted.xlsx")
+    return result_cache.store(key, out.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "converted.xlsx")
 
 
 # ------------------------- File Converter -------------------------
@@ -866,19 +2000,237 @@ def file_converter_page():
     return render_template("file_converter.html", current_user=current_user)
 
 
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", 40_000_000))
+IMAGE_OVERSIZE_POLICY = os.getenv("IMAGE_OVERSIZE_POLICY", "downsample")
+if Image is not None:
+    # Image.open() raises above 2x MAX_IMAGE_PIXELS, before open_image_within_budget()
+    # sees the header. Leave room for a JPEG draft-decoded at 1/8 scale (1/64 the
+    # pixels) so IMAGE_MAX_PIXELS is what decides.
+    Image.MAX_IMAGE_PIXELS = max(Image.MAX_IMAGE_PIXELS or 0, IMAGE_MAX_PIXELS * 32)
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def open_image_header(data):
+    """Image.open() (header only), reporting decompression bombs as ImageTooLarge."""
+    try:
+        return Image.open(as_stream(data))
+    except Image.DecompressionBombError as ex:
+        raise ImageTooLarge(str(ex)) from None
+
+
+def _bitmap_bytes(mode: str, size: tuple[int, int]) -> int:
+    # Pillow keeps 1 byte per pixel for single-band 8-bit modes and 4 for everything else
+    per_pixel = 1 if mode in ("1", "L", "P") else 2 if mode.startswith("I;16") else 4
+    return size[0] * size[1] * per_pixel
+
+
+def open_image_within_budget(data: bytes, target=None, policy: str = None):
+    """Open an image lazily and shrink its decode so it fits IMAGE_MAX_PIXELS.
+
+    Dimensions are read from the header before anything is decoded. JPEGs are
+    decoded at a reduced DCT scale when the requested output (or the pixel
+    budget) allows it; other formats over budget raise ImageTooLarge. Returns the
+    still-undecoded image and the estimated peak bitmap bytes for an RGB convert.
+    """
+    policy = policy or IMAGE_OVERSIZE_POLICY
+    img = open_image_header(data)
+    width, height = img.size
+    draftable = img.format == "JPEG"
+    if draftable and target and target[0] * 2 <= width and target[1] * 2 <= height:
+        img.draft("RGB", target)
+    if img.size[0] * img.size[1] > IMAGE_MAX_PIXELS:
+        if policy != "downsample" or not draftable:
+            raise ImageTooLarge(f"image is {width}x{height}; the limit is {IMAGE_MAX_PIXELS:,} pixels")
+        for scale in (2, 4, 8):
+            if (width / scale) * (height / scale) <= IMAGE_MAX_PIXELS:
+                img.draft("RGB", (-(-width // scale), -(-height // scale)))
+                break
+        else:
+            raise ImageTooLarge(f"image is {width}x{height}; the limit is {IMAGE_MAX_PIXELS:,} pixels")
+    return img, _bitmap_bytes(img.mode, img.size) + _bitmap_bytes("RGB", img.size)
+
+
+def add_memory_headers(response, peak_bytes: int):
+    response.headers["X-Image-Peak-Bytes"] = str(peak_bytes)
+    if resource is not None:
+        # ru_maxrss is KiB on Linux
+        response.headers["X-Worker-Max-RSS"] = str(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+    return response
+
+
 @app.post("/api/convert/image")
 def api_convert_image():
     if Image is None:
         return jsonify({"error": "Pillow not installed"}), 500
     file = request.files.get("file")
     target = request.form.get("target", "png").lower()
+    policy = request.form.get("oversize", IMAGE_OVERSIZE_POLICY)
     if not file:
         return jsonify({"error": "No image uploaded"}), 400
-    image = Image.open(file.stream).convert("RGB")
+    data = read_upload(file)
+    key = result_cache.key("convert/image", {"target": target, "oversize": policy}, data)
+    cached = result_cache.send(key)
+    if cached:
+        return cached
+    try:
+        image, peak = open_image_within_budget(data, policy=policy)
+    except ImageTooLarge as ex:
+        return jsonify({"error": str(ex)}), 413
+    image = image.convert("RGB")
     output = io.BytesIO()
     image.save(output, format=target.upper())
-    output.seek(0)
-    return send_file(output, mimetype=f"image/{target}", as_attachment=True, download_name=f"converted.{target}")
+    response = result_cache.store(
+        key, output.getvalue(), f"image/{target}", f"converted.{target}", headers={"X-Image-Peak-Bytes": str(peak)}
+    )
+    return add_memory_headers(response, peak)
+
+
+FFMPEG_THREADS = int(os.getenv("FFMPEG_THREADS", 2))
+FFMPEG_MAX_CONCURRENCY = max(1, int(os.getenv("FFMPEG_MAX_CONCURRENCY", 2)))
+FFMPEG_QUEUE_TIMEOUT = int(os.getenv("FFMPEG_QUEUE_TIMEOUT", 120))
+FFMPEG_SLOT_DIR = os.getenv("FFMPEG_SLOT_DIR", os.path.join(tempfile.gettempdir(), "toolflock-ffmpeg"))
+
+# Codecs each container can carry as-is, and the encoders used when it can't
+VIDEO_CONTAINERS = {
+    "mp4": {"video": {"h264", "hevc", "mpeg4", "av1"}, "audio": {"aac", "mp3", "alac", "opus"}, "vcodec": "libx264", "acodec": "aac"},
+    "mov": {"video": {"h264", "hevc", "mpeg4", "prores"}, "audio": {"aac", "mp3", "alac", "pcm_s16le"}, "vcodec": "libx264", "acodec": "aac"},
+    "mkv": {"video": None, "audio": None, "vcodec": "libx264", "acodec": "aac"},
+    "webm": {"video": {"vp8", "vp9", "av1"}, "audio": {"opus", "vorbis"}, "vcodec": "libvpx-vp9", "acodec": "libopus"},
+    "avi": {"video": {"mpeg4", "h264", "mjpeg"}, "audio": {"mp3", "ac3", "pcm_s16le"}, "vcodec": "mpeg4", "acodec": "libmp3lame"},
+}
+FFMPEG_PRESETS = {
+    "fast": {"libx264": ["-preset", "veryfast", "-crf", "26"], "libvpx-vp9": ["-deadline", "realtime", "-cpu-used", "8", "-crf", "36", "-b:v", "0"]},
+    "balanced": {"libx264": ["-preset", "medium", "-crf", "23"], "libvpx-vp9": ["-deadline", "good", "-cpu-used", "4", "-crf", "32", "-b:v", "0"]},
+    "quality": {"libx264": ["-preset", "slow", "-crf", "20"], "libvpx-vp9": ["-deadline", "good", "-cpu-used", "1", "-crf", "28", "-b:v", "0"]},
+}
+
+
+class FlockSlots:
+    """At most `count` concurrent holders across every worker process.
+
+    Each slot is a lock file held with flock(), so the kernel frees a slot if its
+    process dies. Without fcntl (Windows) the cap falls back to per-process.
+    """
+
+    def __init__(self, directory: str, count: int):
+        self.directory = directory
+        self.count = count
+        self.local = threading.BoundedSemaphore(count)
+
+    def acquire(self, timeout: float = 0.0):
+        """Return a handle for release(), or None if no slot freed up within `timeout` seconds."""
+        if fcntl is None:
+            return True if self.local.acquire(timeout=timeout) else None
+        deadline = time.time() + timeout
+        os.makedirs(self.directory, exist_ok=True)
+        while True:
+            for i in range(self.count):
+                fh = open(os.path.join(self.directory, f"slot_{i}.lock"), "w")
+                try:
+                    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    fh.close()
+                    continue
+                return fh
+            if time.time() >= deadline:
+                return None
+            time.sleep(0.25)
+
+    def release(self, handle) -> None:
+        if handle is True:
+            self.local.release()
+        else:
+            handle.close()
+
+
+_ffmpeg_slots = FlockSlots(FFMPEG_SLOT_DIR, FFMPEG_MAX_CONCURRENCY)
+
+
+def probe_media(path: str):
+    """Return ffprobe's stream/format description, or None if it can't be read."""
+    if shutil.which("ffprobe") is None:
+        return None
+    try:
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-print_format", "json", "-show_streams", "-show_format", path],
+            check=True, capture_output=True, timeout=30,
+        ).stdout
+        return json.loads(out)
+    except (subprocess.SubprocessError, ValueError):
+        return None
+
+
+def plan_video_conversion(probe, target: str, preset: str) -> tuple[str, list[str]]:
+    """Choose per-stream copy vs. transcode args; returns (plan name, ffmpeg output args).
+
+    Without a probe every stream is transcoded with the container's default encoders.
+    """
+    container = VIDEO_CONTAINERS.get(target)
+    threads = ["-threads", str(FFMPEG_THREADS)]
+    if container is None:
+        return "transcode", threads
+    args = []
+    copied = transcoded = 0
+    for kind, flag in (("video", "-c:v"), ("audio", "-c:a")):
+        codecs = None
+        if probe is not None:
+            # Cover art is exposed as a video stream flagged attached_pic; it is not mapped below
+            codecs = {
+                st.get("codec_name") for st in probe.get("streams", [])
+                if st.get("codec_type") == kind and not st.get("disposition", {}).get("attached_pic")
+            }
+            if not codecs:
+                continue
+        allowed = container[kind]
+        if codecs is not None and (allowed is None or codecs <= allowed):
+            args += [flag, "copy"]
+            copied += 1
+        else:
+            encoder = container["vcodec" if kind == "video" else "acodec"]
+            args += [flag, encoder]
+            if kind == "video":
+                args += FFMPEG_PRESETS[preset].get(encoder, [])
+            transcoded += 1
+    args += ["-map", "0:V?", "-map", "0:a?"]
+    if not transcoded:
+        return "remux", args
+    return ("partial-copy" if copied else "transcode"), args + threads
+
+
+class _FfmpegSlot:
+    """Hold one of FFMPEG_MAX_CONCURRENCY slots shared by every worker process."""
+
+    def __enter__(self):
+        self.handle = _ffmpeg_slots.acquire(FFMPEG_QUEUE_TIMEOUT)
+        if self.handle is None:
+            raise TimeoutError("ffmpeg is busy")
+        return self
+
+    def __exit__(self, *exc):
+        _ffmpeg_slots.release(self.handle)
+        return False
+
+
+def run_ffmpeg(in_path: str, out_path: str, out_args: list[str], duration: float) -> None:
+    """Run ffmpeg under the global slot limit, feeding -progress output to the job tracker."""
+    cmd = ["ffmpeg", "-y", "-nostats", "-progress", "pipe:1", "-i", in_path] + out_args + [out_path]
+    with _FfmpegSlot(), tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, stdin=subprocess.DEVNULL, text=True)
+        last = 0.0
+        for line in proc.stdout:
+            key, _, value = line.strip().partition("=")
+            if key == "out_time_us" and duration and value.isdigit():
+                percent = min(99.0, int(value) / 1_000_000 / duration * 100)
+                if percent - last >= 1:
+                    report_job_progress(percent)
+                    last = percent
+        if proc.wait() != 0:
+            err.seek(0)
+            tail = err.read().decode("utf-8", "replace").strip().splitlines()[-1:]
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr="".join(tail))
 
 
 @app.post("/api/convert/video")
@@ -886,24 +2238,179 @@ def api_convert_video():
     # Requires ffmpeg installed on OS and present in PATH
     file = request.files.get("file")
     target = request.form.get("target", "mp4").lower()
+    preset = request.form.get("preset", "balanced").lower()
     if not file:
         return jsonify({"error": "No video uploaded"}), 400
+    if preset not in FFMPEG_PRESETS:
+        return jsonify({"error": f"preset must be one of: {', '.join(FFMPEG_PRESETS)}"}), 400
     if shutil.which("ffmpeg") is None:
         return jsonify({"error": "ffmpeg not found. Please install ffmpeg and add to PATH"}), 500
     with tempfile.TemporaryDirectory() as td:
         in_path = os.path.join(td, "input")
         out_path = os.path.join(td, f"output.{target}")
         file.save(in_path)
-        cmd = ["ffmpeg", "-y", "-i", in_path, out_path]
+        key = result_cache.key("convert/video", {"target": target, "preset": preset}, file_sha256(in_path))
+        cached = result_cache.send(key)
+        if cached:
+            return cached
+        probe = probe_media(in_path)
+        plan, out_args = plan_video_conversion(probe, target, preset)
         try:
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            duration = float((probe or {}).get("format", {}).get("duration") or 0)
+        except ValueError:
+            duration = 0.0
+        try:
+            run_ffmpeg(in_path, out_path, out_args, duration)
+        except TimeoutError:
+            return jsonify({"error": "Video converter is busy, please retry shortly"}), 503
         except subprocess.CalledProcessError:
-            return jsonify({"error": "Conversion failed"}), 500
-        return send_file(out_path, as_attachment=True, download_name=f"converted.{target}")
+            if plan == "transcode":
+                return jsonify({"error": "Conversion failed"}), 500
+            # Stream copy can still trip over container quirks; fall back to a full transcode
+            try:
+                run_ffmpeg(in_path, out_path, plan_video_conversion(None, target, preset)[1], duration)
+            except TimeoutError:
+                return jsonify({"error": "Video converter is busy, please retry shortly"}), 503
+            except subprocess.CalledProcessError:
+                return jsonify({"error": "Conversion failed"}), 500
+            plan = "transcode"
+        mimetype = mimetypes.guess_type(out_path)[0] or "application/octet-stream"
+        return result_cache.store(key, out_path, mimetype, f"converted.{target}", {"X-FFmpeg-Plan": plan})
 
 
 # ------------------------- URL Shortener -------------------------
 
+SHORT_LINK_CACHE_SIZE = int(os.getenv("SHORT_LINK_CACHE_SIZE", 10_000))
+SHORT_LINK_CACHE_TTL = int(os.getenv("SHORT_LINK_CACHE_TTL", 300))
+SHORT_LINK_NEGATIVE_TTL = int(os.getenv("SHORT_LINK_NEGATIVE_TTL", 30))
+# Any shared/browser caching of the redirect replays it without reaching the app,
+# so those clicks are never counted. Off by default; set a max-age to trade
+# click accuracy for fewer requests.
+SHORT_LINK_MAX_AGE = int(os.getenv("SHORT_LINK_MAX_AGE", 0))
+short_link_cache = TTLCache(SHORT_LINK_CACHE_SIZE, SHORT_LINK_CACHE_TTL)
+# Codes that don't exist, so scanners probing random codes don't reach SQLite
+short_link_misses = TTLCache(SHORT_LINK_CACHE_SIZE, SHORT_LINK_NEGATIVE_TTL)
+
+
+CLICK_FLUSH_INTERVAL = float(os.getenv("CLICK_FLUSH_INTERVAL", 5))
+CLICK_FLUSH_THRESHOLD = int(os.getenv("CLICK_FLUSH_THRESHOLD", 1000))
+CLICK_BUCKET_SECONDS = 3600
+
+
+class ClickTracker:
+    """Buffer short-link clicks in memory and write aggregated counts in the background."""
+
+    def __init__(self):
+        self.pending = {}
+        self.pending_events = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.pid = None
+
+    def record(self, code: str, referrer: str) -> None:
+        bucket = int(time.time()) // CLICK_BUCKET_SECONDS * CLICK_BUCKET_SECONDS
+        key = (code, bucket, referrer)
+        with self.lock:
+            self.pending[key] = self.pending.get(key, 0) + 1
+            self.pending_events += 1
+            full = self.pending_events >= CLICK_FLUSH_THRESHOLD
+        self._ensure_thread()
+        if full:
+            self.wakeup.set()
+
+    def _ensure_thread(self) -> None:
+        if self.thread is None or self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.thread = threading.Thread(target=self._run, name="click-flusher", daemon=True)
+            self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self.wakeup.wait(timeout=CLICK_FLUSH_INTERVAL)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception as ex:
+                print(f"Click flush failed: {ex}")
+
+    def flush(self) -> None:
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending, self.pending_events = self.pending, {}, 0
+            if not batch:
+                return
+            try:
+                with get_db() as conn:
+                    conn.executemany(
+                        "INSERT INTO short_url_clicks(code, bucket, referrer, clicks) VALUES(?, ?, ?, ?) "
+                        "ON CONFLICT(code, bucket, referrer) DO UPDATE SET clicks = clicks + excluded.clicks",
+                        [(code, bucket, ref, n) for (code, bucket, ref), n in batch.items()],
+                    )
+            except sqlite3.Error:
+                # Put the counts back so the next flush retries them
+                with self.lock:
+                    for key, n in batch.items():
+                        self.pending[key] = self.pending.get(key, 0) + n
+                        self.pending_events += n
+                raise
+
+    def pending_for(self, code: str) -> dict:
+        with self.lock:
+            return {key: n for key, n in self.pending.items() if key[0] == code}
+
+
+click_tracker = ClickTracker()
+# Gunicorn's graceful worker exit runs atexit handlers, so buffered clicks are written out
+atexit.register(click_tracker.flush)
+
+
+SHORTEN_BATCH_MAX = int(os.getenv("SHORTEN_BATCH_MAX", 50_000))
+
+
+def shorten_urls(urls: list[str]) -> dict:
+    """Map each URL to (code, existing), reusing codes for URLs already shortened.
+
+    New URLs get allocator codes and are inserted in one transaction. The unique
+    url_hash index settles races with other requests or workers inserting the
+    same URL: the losing insert is skipped and the winner's code is read back.
+    """
+    by_hash = {hash_url(u): u for u in dict.fromkeys(urls)}
+    result = {}
+    conn = get_db()
+    hashes = list(by_hash)
+    for i in range(0, len(hashes), 500):
+        chunk = hashes[i:i + 500]
+        rows = conn.execute(
+            f"SELECT url_hash, url, code FROM short_urls WHERE url_hash IN ({','.join('?' * len(chunk))})", chunk
+        )
+        for h, url, code in rows:
+            if by_hash.get(h) == url and url not in result:
+                result[url] = (code, True)
+    missing = [(h, u) for h, u in by_hash.items() if u not in result]
+    if not missing:
+        return result
+    codes = code_allocator.allocate(conn, len(missing))
+    rows = [(code, u, h) for code, (h, u) in zip(codes, missing)]
+    with conn:
+        conn.executemany(
+            "INSERT INTO short_urls(code, url, url_hash) VALUES(?, ?, ?) ON CONFLICT(url_hash) DO NOTHING", rows
+        )
+    stored = {}
+    for i in range(0, len(rows), 500):
+        chunk = [h for _, _, h in rows[i:i + 500]]
+        stored.update(conn.execute(
+            f"SELECT url_hash, code FROM short_urls WHERE url_hash IN ({','.join('?' * len(chunk))})", chunk
+        ))
+    for code, url, h in rows:
+        # A different code means someone else inserted this URL first
+        result[url] = (stored[h], stored[h] != code)
+        short_link_misses.pop(stored[h])
+        short_link_cache.set(stored[h], url)
+    return result
+
+
 @app.get("/shortener")
 def url_shortener_page():
     return render_template("url_shortener.html", current_user=current_user)
@@ -915,25 +2422,132 @@ def api_shorten():
     url = data.get("url")
     if not url:
         return jsonify({"error": "url is required"}), 400
-    code = generate_code()
-    with sqlite3.connect(DB_PATH) as conn:
-        try:
-            conn.execute("INSERT INTO short_urls(code, url) VALUES(?, ?)", (code, url))
-        except sqlite3.IntegrityError:
-            code = generate_code()
-            conn.execute("INSERT INTO short_urls(code, url) VALUES(?, ?)", (code, url))
+    if not isinstance(url, str):
+        return jsonify({"error": "url must be a string"}), 400
+    code, _ = shorten_urls([url])[url]
     short = request.host_url.rstrip("/") + url_for("redirect_short", code=code)
     return jsonify({"code": code, "shortUrl": short})
 
 
+@app.post("/api/shorten/batch")
+def api_shorten_batch():
+    upload = request.files.get("file")
+    if upload:
+        reader = csv.reader(io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline=""))
+        urls = [row[0].strip() for row in reader if row and row[0].strip() and row[0].strip().lower() != "url"]
+    else:
+        data = request.get_json(force=True, silent=True)
+        urls = data.get("urls") if isinstance(data, dict) else data
+        if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
+            return jsonify({"error": "Send a JSON array of URLs, {\"urls\": [...]}, or a CSV file"}), 400
+        urls = [u.strip() for u in urls if u.strip()]
+    if not urls:
+        return jsonify({"error": "No URLs provided"}), 400
+    if len(urls) > SHORTEN_BATCH_MAX:
+        return jsonify({"error": f"At most {SHORTEN_BATCH_MAX} URLs per batch"}), 413
+    codes = shorten_urls(urls)
+    base = request.host_url.rstrip("/")
+    results = [
+        {"url": u, "code": codes[u][0], "shortUrl": base + url_for("redirect_short", code=codes[u][0]), "existing": codes[u][1]}
+        for u in urls
+    ]
+    if upload:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["url", "code", "short_url", "existing"])
+        writer.writerows([r["url"], r["code"], r["shortUrl"], r["existing"]] for r in results)
+        return send_file(io.BytesIO(out.getvalue().encode("utf-8")), mimetype="text/csv", as_attachment=True, download_name="short_links.csv")
+    return jsonify({"results": results, "created": sum(not existing for _, existing in codes.values())})
+
+
 @app.get("/u/<code>")
 def redirect_short(code: str):
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.execute("SELECT url FROM short_urls WHERE code = ?", (code,))
-        row = cur.fetchone()
-    if not row:
-        return render_template("url_shortener.html", error="Invalid code"), 404
-    return redirect(row[0])
+    url = short_link_cache.get(code)
+    if url is None:
+        if code in short_link_misses:
+            row = None
+        else:
+            row = get_db().execute("SELECT url FROM short_urls WHERE code = ?", (code,)).fetchone()
+        if not row:
+            short_link_misses.set(code, True)
+            response = app.make_response((render_template("url_shortener.html", error="Invalid code"), 404))
+            response.headers["Cache-Control"] = f"public, max-age={SHORT_LINK_NEGATIVE_TTL}"
+            return response
+        url = row[0]
+        short_link_cache.set(code, url)
+    click_tracker.record(code, urlparse(request.referrer or "").netloc or "direct")
+    response = redirect(url)
+    if SHORT_LINK_MAX_AGE > 0:
+        response.headers["Cache-Control"] = f"public, max-age={SHORT_LINK_MAX_AGE}"
+    else:
+        response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@app.get("/api/shorten/<code>/stats")
+def api_short_link_stats(code: str):
+    conn = get_db()
+    if conn.execute("SELECT 1 FROM short_urls WHERE code = ?", (code,)).fetchone() is None:
+        return jsonify({"error": "Unknown code"}), 404
+    counts = {}
+    for bucket, referrer, clicks in conn.execute(
+        "SELECT bucket, referrer, clicks FROM short_url_clicks WHERE code = ?", (code,)
+    ):
+        counts[(bucket, referrer)] = clicks
+    # Include this worker's not-yet-flushed clicks so the numbers don't lag
+    for (_, bucket, referrer), n in click_tracker.pending_for(code).items():
+        counts[(bucket, referrer)] = counts.get((bucket, referrer), 0) + n
+    by_referrer = {}
+    by_hour = {}
+    for (bucket, referrer), n in counts.items():
+        by_referrer[referrer] = by_referrer.get(referrer, 0) + n
+        hour = datetime.fromtimestamp(bucket, timezone.utc).strftime("%Y-%m-%dT%H:00:00Z")
+        by_hour[hour] = by_hour.get(hour, 0) + n
+    return jsonify({
+        "code": code,
+        "totalClicks": sum(counts.values()),
+        "referrers": dict(sorted(by_referrer.items(), key=lambda item: -item[1])),
+        "hourly": dict(sorted(by_hour.items())),
+    })
+
+
+@app.cli.command("bench-shortener")
+@click.option("--rows", default=10_000_000, show_default=True, help="Rows to insert.")
+@click.option("--batch", default=10_000, show_default=True, help="URLs per transaction.")
+def bench_shortener(rows: int, batch: int):
+    """Measure code allocation + insert throughput on a scratch database."""
+    with tempfile.TemporaryDirectory() as td:
+        conn = sqlite3.connect(os.path.join(td, "bench.db"))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            create_shortener_schema(conn)
+        allocator = CodeAllocator(CODE_BLOCK_SIZE)
+        started = window_start = time.perf_counter()
+        done = 0
+        while done < rows:
+            n = min(batch, rows - done)
+            urls = [f"https://example.com/campaign/{done + i}" for i in range(n)]
+            codes = allocator.allocate(conn, n)
+            with conn:
+                conn.executemany(
+                    "INSERT INTO short_urls(code, url, url_hash) VALUES(?, ?, ?)",
+                    [(code, u, hash_url(u)) for code, u in zip(codes, urls)],
+                )
+            done += n
+            if done % 1_000_000 == 0 or done == rows:
+                now = time.perf_counter()
+                rate = (done % 1_000_000 or 1_000_000) / (now - window_start)
+                click.echo(f"{done:>12,} rows  {rate:>10,.0f} rows/s (last window)")
+                window_start = now
+        elapsed = time.perf_counter() - started
+        click.echo(f"Inserted {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s), no code collisions")
+        conn.close()
+
+
+@app.get("/api/shortener/cache-stats")
+def api_short_link_cache_stats():
+    return jsonify({"links": short_link_cache.stats(), "unknownCodes": short_link_misses.stats()})
 
 
 # ----------------------- QR Code Tools ---------------------------
@@ -943,27 +2557,201 @@ def qr_tools_page():
     return render_template("qr_tools.html", current_user=current_user)
 
 
+QR_MAX_SIZE = int(os.getenv("QR_MAX_SIZE", 4096))
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", 2048))
+qr_cache = TTLCache(QR_CACHE_SIZE, int(os.getenv("QR_CACHE_TTL", 86400)))
+
+
+QR_BATCH_MAX = int(os.getenv("QR_BATCH_MAX", 5000))
+QR_BATCH_WORKERS = max(1, int(os.getenv("QR_BATCH_WORKERS", min(4, os.cpu_count() or 1))))
+_qr_pool = None
+_qr_pool_lock = threading.Lock()
+
+
+def _qr_matrix(text: str) -> list[list[bool]]:
+    qr = qrcode.QRCode(version=None, border=2)
+    qr.add_data(text)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def _qr_color(value: str):
+    # Validates the color (raises ValueError) so it is also safe to embed in SVG
+    if value.lower() == "transparent":
+        return None
+    rgb = ImageColor.getrgb(value)
+    # #RRGGBBAA / rgba() give 4-tuples, which would shift the 2-entry PNG palette
+    if len(rgb) == 4:
+        if rgb[3] != 255:
+            raise ValueError(f"color {value!r} is translucent; only 'transparent' is supported")
+        rgb = rgb[:3]
+    return rgb
+
+
+def render_qr(text: str, size: int, fill: str, back: str, fmt: str = "png") -> bytes:
+    """Render a QR code straight at `size` pixels, as PNG or SVG."""
+    matrix = _qr_matrix(text)
+    n = len(matrix)
+    fill_rgb, back_rgb = _qr_color(fill), _qr_color(back)
+    if fmt == "svg":
+        runs = []
+        for y, row in enumerate(matrix):
+            x = 0
+            while x < n:
+                if row[x]:
+                    start = x
+                    while x < n and row[x]:
+                        x += 1
+                    runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+                else:
+                    x += 1
+        background = f'<rect width="{n}" height="{n}" fill="{back}"/>' if back_rgb else ""
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {n} {n}" '
+            f'shape-rendering="crispEdges">{background}<path fill="{fill}" d="{"".join(runs)}"/></svg>'
+        ).encode("utf-8")
+    # Pick the largest whole-pixel module size that fits, then pad with quiet zone
+    modules = Image.frombytes("P", (n, n), bytes(int(cell) for row in matrix for cell in row))
+    box = size // n
+    scaled = modules.resize((n * box, n * box) if box else (size, size), Image.NEAREST)
+    img = Image.new("P", (size, size), 0)
+    offset = (size - scaled.width) // 2
+    img.paste(scaled, (offset, offset))
+    img.putpalette(list(back_rgb or (255, 255, 255)) + list(fill_rgb or (0, 0, 0)))
+    if back_rgb is None:
+        img.info["transparency"] = 0
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def render_qr_png(text: str, size: int, fill: str, back: str) -> bytes:
+    key = (text, size, fill, back)
+    png = qr_cache.get(key)
+    if png is None:
+        png = render_qr(text, size, fill, back)
+        qr_cache.set(key, png)
+    return png
+
+
+def render_qr_item(text: str, size: int, fill: str, back: str, fmt: str):
+    """render_qr() for batches: returns (data, None), or (None, error) if the payload can't be encoded."""
+    try:
+        return render_qr(text, size, fill, back, fmt), None
+    except (qrcode.exceptions.DataOverflowError, ValueError):
+        # Older qrcode releases report an overflow as an invalid version (> 40)
+        return None, f"payload of {len(text)} characters is too long for a QR code"
+
+
+def _get_qr_pool() -> ProcessPoolExecutor:
+    global _qr_pool
+    with _qr_pool_lock:
+        if _qr_pool is None:
+            _qr_pool = ProcessPoolExecutor(max_workers=QR_BATCH_WORKERS)
+        return _qr_pool
+
+
+def _qr_params(data) -> tuple[str, int, str, str]:
+    size = int(data.get("size", 256))
+    if not 16 <= size <= QR_MAX_SIZE:
+        raise ValueError(f"size must be between 16 and {QR_MAX_SIZE}")
+    return data.get("text", ""), size, data.get("fill", "#000000"), data.get("back", "#FFFFFF")
+
+
 @app.post("/api/qr/generate")
 def api_qr_generate():
     if qrcode is None:
         return jsonify({"error": "qrcode not installed"}), 500
-    data = request.get_json(force=True)
-    text = data.get("text", "")
-    size = int(data.get("size", 256))
-    fill = data.get("fill", "#000000")
-    back = data.get("back", "#FFFFFF")
-    if not text:
-        return jsonify({"error": "text is required"}), 400
-    qr = qrcode.QRCode(version=None, box_size=10, border=2)
-    qr.add_data(text)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color=fill, back_color=back).resize((size, size))
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    b64 = base64.b64encode(buf.getvalue()).decode("ascii")
+    try:
+        text, size, fill, back = _qr_params(request.get_json(force=True))
+        if not text:
+            return jsonify({"error": "text is required"}), 400
+        png = render_qr_png(text, size, fill, back)
+    except ValueError as ex:
+        return jsonify({"error": f"Invalid input: {ex}"}), 400
+    b64 = base64.b64encode(png).decode("ascii")
     return jsonify({"pngBase64": f"data:image/png;base64,{b64}"})
 
 
+@app.post("/api/qr/batch")
+def api_qr_batch():
+    """Render many codes into a zip. Accepts JSON {"items": [...]} or a CSV of text[,filename]."""
+    if qrcode is None or Image is None:
+        return jsonify({"error": "qrcode and Pillow required"}), 500
+    upload = request.files.get("file")
+    if upload:
+        options = request.form
+        reader = csv.reader(io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline=""))
+        items = [{"text": row[0], "filename": row[1] if len(row) > 1 else ""} for row in reader if row and row[0]]
+        if items and items[0]["text"].lower() == "text":
+            items = items[1:]
+    else:
+        options = request.get_json(force=True, silent=True)
+        if not isinstance(options, dict) or not isinstance(options.get("items"), list):
+            return jsonify({"error": "items must be a list of strings or {text, filename} objects"}), 400
+        items = [item if isinstance(item, dict) else {"text": str(item)} for item in options["items"]]
+    items = [item for item in items if item.get("text")]
+    fmt = str(options.get("format", "png")).lower()
+    if fmt not in ("png", "svg"):
+        return jsonify({"error": "format must be png or svg"}), 400
+    if not items:
+        return jsonify({"error": "No QR payloads provided"}), 400
+    if len(items) > QR_BATCH_MAX:
+        return jsonify({"error": f"At most {QR_BATCH_MAX} codes per batch"}), 413
+    try:
+        _, size, fill, back = _qr_params(options)
+        _qr_color(fill)
+        _qr_color(back)
+    except ValueError as ex:
+        return jsonify({"error": f"Invalid input: {ex}"}), 400
+
+    texts = [item["text"] for item in items]
+    n = len(texts)
+    args = ([size] * n, [fill] * n, [back] * n, [fmt] * n)
+    if n < 50 or QR_BATCH_WORKERS == 1:
+        rendered = map(render_qr_item, texts, *args)
+    else:
+        rendered = _get_qr_pool().map(render_qr_item, texts, *args, chunksize=max(1, n // (QR_BATCH_WORKERS * 4)))
+    mem_zip = io.BytesIO()
+    used = set()
+    errors = []
+    with zipfile.ZipFile(mem_zip, "w", zipfile.ZIP_STORED if fmt == "png" else zipfile.ZIP_DEFLATED) as zf:
+        for i, (item, (data, error)) in enumerate(zip(items, rendered), start=1):
+            stem = re.sub(r"[^A-Za-z0-9._-]+", "_", str(item.get("filename") or "")).strip("._") or f"qr_{i:05d}"
+            if stem in used:
+                stem = f"{stem}_{i}"
+            used.add(stem)
+            if error:
+                # One bad payload shouldn't sink a run of thousands; list it instead
+                errors.append(f"item {i} ({stem}): {error}")
+                continue
+            zf.writestr(f"{stem}.{fmt}", data)
+        if errors:
+            zf.writestr("errors.txt", "\n".join(errors) + "\n")
+    mem_zip.seek(0)
+    response = send_file(mem_zip, mimetype="application/zip", as_attachment=True, download_name="qr_codes.zip")
+    response.headers["X-QR-Errors"] = str(len(errors))
+    return response
+
+
+@app.get("/api/qr/generate")
+def api_qr_png():
+    # Raw PNG for <img src> use; identical query strings always yield identical bytes
+    if qrcode is None:
+        return jsonify({"error": "qrcode not installed"}), 500
+    try:
+        text, size, fill, back = _qr_params(request.args)
+        if not text:
+            return jsonify({"error": "text is required"}), 400
+        png = render_qr_png(text, size, fill, back)
+    except ValueError as ex:
+        return jsonify({"error": f"Invalid input: {ex}"}), 400
+    response = app.response_class(png, mimetype="image/png")
+    response.set_etag(hashlib.sha256(png).hexdigest())
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response.make_conditional(request)
+
+
 # ---------------- Image Resizer & Compressor (Bulk) --------------
 
 @app.get("/image-tools")
@@ -971,6 +2759,26 @@ def image_tools_page():
     return render_template("image_tools.html", current_user=current_user)
 
 
+IMAGE_BULK_WORKERS = max(1, int(os.getenv("IMAGE_BULK_WORKERS", min(8, os.cpu_count() or 1))))
+_image_pool = ThreadPoolExecutor(max_workers=IMAGE_BULK_WORKERS, thread_name_prefix="image-bulk")
+
+
+def process_bulk_image(data: bytes, width, height, quality: int, fmt: str, policy: str) -> tuple[bytes, int]:
+    with open_image_header(data) as probe:
+        target = (width or probe.width, height or probe.height)
+    # The target doubles as a draft hint so JPEGs skip DCT scales we would throw away
+    img, peak = open_image_within_budget(data, target if (width or height) else None, policy)
+    img = img.convert("RGB")
+    if width or height:
+        img = img.resize(target, reducing_gap=3.0)
+    out = io.BytesIO()
+    save_kwargs = {"quality": quality}
+    if fmt == "png":
+        save_kwargs.pop("quality", None)
+    img.save(out, format=fmt.upper(), **save_kwargs)
+    return out.getvalue(), peak
+
+
 @app.post("/api/image/bulk")
 def api_image_bulk():
     if Image is None:
@@ -980,25 +2788,43 @@ def api_image_bulk():
     height = request.form.get("height")
     quality = int(request.form.get("quality", 80))
     fmt = request.form.get("format", "jpeg").lower()
+    policy = request.form.get("oversize", IMAGE_OVERSIZE_POLICY)
     if not files:
         return jsonify({"error": "No images uploaded"}), 400
     width_i = int(width) if width else None
     height_i = int(height) if height else None
+    uploads = [(f.filename, read_upload(f)) for f in files]
+    parts = [part for name, data in uploads for part in (name.encode(), data)]
+    params = {"width": width_i, "height": height_i, "quality": quality, "format": fmt, "oversize": policy}
+    key = result_cache.key("image/bulk", params, *parts)
+    cached = result_cache.send(key)
+    if cached:
+        return cached
+    # Already-compressed formats gain nothing from deflate
+    compression = zipfile.ZIP_DEFLATED if fmt in ("png", "bmp", "tiff") else zipfile.ZIP_STORED
+    futures = {
+        _image_pool.submit(process_bulk_image, data, width_i, height_i, quality, fmt, policy): filename
+        for filename, data in uploads
+    }
+    peaks = []
     mem_zip = io.BytesIO()
-    with zipfile.ZipFile(mem_zip, "w", zipfile.ZIP_DEFLATED) as zf:
-        for f in files:
-            img = Image.open(f.stream)
-            img = img.convert("RGB")
-            if width_i or height_i:
-                img = img.resize((width_i or img.width, height_i or img.height))
-            out = io.BytesIO()
-            save_kwargs = {"quality": quality}
-            if fmt == "png":
-                save_kwargs.pop("quality", None)
-            img.save(out, format=fmt.upper(), **save_kwargs)
-            zf.writestr(os.path.splitext(f.filename)[0] + f"_processed.{fmt}", out.getvalue())
-    mem_zip.seek(0)
-    return send_file(mem_zip, mimetype="application/zip", as_attachment=True, download_name="images_processed.zip")
+    try:
+        with zipfile.ZipFile(mem_zip, "w", compression) as zf:
+            for future in as_completed(futures):
+                result, peak = future.result()
+                peaks.append(peak)
+                zf.writestr(os.path.splitext(futures[future])[0] + f"_processed.{fmt}", result)
+    except ImageTooLarge as ex:
+        name = futures[future]
+        for pending in futures:
+            pending.cancel()
+        return jsonify({"error": f"{name}: {ex}"}), 413
+    # Images decode concurrently, so the worst case is the largest IMAGE_BULK_WORKERS of them at once
+    peak = sum(sorted(peaks, reverse=True)[:IMAGE_BULK_WORKERS])
+    response = result_cache.store(
+        key, mem_zip.getvalue(), "application/zip", "images_processed.zip", headers={"X-Image-Peak-Bytes": str(peak)}
+    )
+    return add_memory_headers(response, peak)
 
 
 # ------------------------ Unit Converter -------------------------
@@ -1015,20 +2841,206 @@ def speed_test_page():
     return render_template("speed_test.html", current_user=current_user)
 
 
-@app.post("/api/speedtest")
-def api_speedtest():
-    if speedtest is None:
-        return jsonify({"error": "speedtest-cli not installed"}), 500
-    s = speedtest.Speedtest()
-    s.get_best_server()
-    down = s.download() / 1_000_000
-    up = s.upload() / 1_000_000
-    ping = s.results.ping
-    return jsonify({"downloadMbps": round(down, 2), "uploadMbps": round(up, 2), "pingMs": round(ping, 2)})
+SPEEDTEST_MAX_BYTES = int(os.getenv("SPEEDTEST_MAX_BYTES", 100 * 1024 * 1024))
+# A sync gunicorn worker is pinned for the whole stream, so the cap is shared by
+# every worker process and defaults to half of them, leaving the rest for the site
+SPEEDTEST_MAX_CONCURRENCY = max(1, int(os.getenv("SPEEDTEST_MAX_CONCURRENCY", int(os.getenv("WEB_CONCURRENCY", 2)) // 2)))
+SPEEDTEST_SLOT_DIR = os.getenv("SPEEDTEST_SLOT_DIR", os.path.join(tempfile.gettempdir(), "toolflock-speedtest"))
+SPEEDTEST_BLOCK_SIZE = 1024 * 1024
+# Random bytes defeat any compression on the path; generated once and reused
+# for every download so serving a test costs no CPU beyond the socket writes
+_speedtest_block = os.urandom(SPEEDTEST_BLOCK_SIZE)
+_speedtest_slots = FlockSlots(SPEEDTEST_SLOT_DIR, SPEEDTEST_MAX_CONCURRENCY)
+
+
+def _speedtest_busy():
+    response = jsonify({"error": "Too many speed tests running; try again shortly"})
+    response.status_code = 503
+    response.headers["Retry-After"] = "5"
+    return response
+
+
+def _no_store(response):
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.get("/api/speedtest/ping")
+def api_speedtest_ping():
+    return _no_store(jsonify({"serverTime": time.time()}))
+
+
+@app.get("/api/speedtest/download")
+def api_speedtest_download():
+    try:
+        size = int(request.args.get("bytes", 10 * 1024 * 1024))
+    except ValueError:
+        return jsonify({"error": "bytes must be an integer"}), 400
+    if not 1 <= size <= SPEEDTEST_MAX_BYTES:
+        return jsonify({"error": f"bytes must be between 1 and {SPEEDTEST_MAX_BYTES}"}), 400
+    slot = _speedtest_slots.acquire()
+    if slot is None:
+        return _speedtest_busy()
+
+    def generate():
+        full, rest = divmod(size, SPEEDTEST_BLOCK_SIZE)
+        for _ in range(full):
+            yield _speedtest_block
+        if rest:
+            yield _speedtest_block[:rest]
+
+    response = app.response_class(generate(), mimetype="application/octet-stream")
+    response.headers["Content-Length"] = str(size)
+    response.headers["Content-Encoding"] = "identity"
+    # The slot is held until the client has drained (or dropped) the stream
+    response.call_on_close(lambda: _speedtest_slots.release(slot))
+    return _no_store(response)
+
+
+@app.post("/api/speedtest/upload")
+def api_speedtest_upload():
+    """Read and discard the request body, timing how long it took to arrive."""
+    if request.content_length is not None and request.content_length > SPEEDTEST_MAX_BYTES:
+        return jsonify({"error": f"Upload too large; the limit is {SPEEDTEST_MAX_BYTES} bytes"}), 413
+    slot = _speedtest_slots.acquire()
+    if slot is None:
+        return _speedtest_busy()
+    try:
+        stream = request.stream
+        received = 0
+        start = time.perf_counter()
+        while received <= SPEEDTEST_MAX_BYTES:
+            block = stream.read(256 * 1024)
+            if not block:
+                break
+            received += len(block)
+        seconds = time.perf_counter() - start
+    finally:
+        _speedtest_slots.release(slot)
+    if received > SPEEDTEST_MAX_BYTES:
+        return jsonify({"error": f"Upload too large; the limit is {SPEEDTEST_MAX_BYTES} bytes"}), 413
+    return _no_store(jsonify({
+        "bytes": received,
+        "seconds": round(seconds, 6),
+        "mbps": round(received * 8 / seconds / 1_000_000, 2) if seconds > 0 else None,
+    }))
 
 
 # ------------------------ Currency Converter ---------------------
 
+EXCHANGE_RATE_URL = os.getenv("EXCHANGE_RATE_URL", "https://open.er-api.com/v6/latest/{base}")
+EXCHANGE_RATE_BASE = os.getenv("EXCHANGE_RATE_BASE", "USD").upper()
+EXCHANGE_RATE_TTL = int(os.getenv("EXCHANGE_RATE_TTL", 3600))
+EXCHANGE_RATE_RETRY = int(os.getenv("EXCHANGE_RATE_RETRY", 60))
+
+
+class RatesUnavailable(RuntimeError):
+    pass
+
+
+class RateSnapshot:
+    """An immutable base-currency rate table; any pair is a local cross rate."""
+
+    def __init__(self, base: str, rates: dict, fetched_at: float):
+        self.base = base
+        self.rates = rates
+        self.fetched_at = fetched_at
+
+    def rate(self, from_cur: str, to_cur: str) -> float:
+        try:
+            return self.rates[to_cur] / self.rates[from_cur]
+        except KeyError as e:
+            raise KeyError(e.args[0]) from None
+
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.fetched_at, timezone.utc).isoformat()
+
+
+class RateProvider:
+    """Serve exchange rates from a cached table, refreshed stale-while-revalidate.
+
+    The first call blocks on a fetch. After `ttl` seconds the current table is
+    still returned while one background thread refreshes it; if the upstream
+    is down the stale table keeps being served and refreshes are retried at
+    most every `retry` seconds.
+    """
+
+    def __init__(self, url: str, base: str, ttl: float, retry: float):
+        self.url = url
+        self.base = base
+        self.ttl = ttl
+        self.retry = retry
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.lock = threading.Lock()
+        self.fetched = threading.Condition(self.lock)
+        self.current = None
+        self.refreshing = False
+        self.next_attempt = 0.0
+        self.last_error = None
+
+    def fetch(self) -> RateSnapshot:
+        r = self.session.get(self.url.format(base=self.base), params={"base": self.base}, timeout=(3.05, 10))
+        r.raise_for_status()
+        j = r.json()
+        rates = j.get("rates") or j.get("conversion_rates")
+        if not isinstance(rates, dict) or not rates:
+            raise ValueError("rate table missing from provider response")
+        base = str(j.get("base") or j.get("base_code") or self.base).upper()
+        table = {str(k).upper(): float(v) for k, v in rates.items() if float(v) > 0}
+        table[base] = 1.0
+        return RateSnapshot(base, table, time.time())
+
+    def _refresh(self) -> None:
+        snapshot = None
+        error = "refresh interrupted"
+        try:
+            snapshot = self.fetch()
+        except Exception as e:
+            # Any upstream surprise (e.g. a JSON list instead of an object) must
+            # still release `refreshing`, or no refresh would ever run again
+            error = str(e) or type(e).__name__
+            app.logger.warning("Exchange rate refresh failed: %s", error)
+        finally:
+            with self.fetched:
+                if snapshot is not None:
+                    self.current = snapshot
+                    self.last_error = None
+                    self.next_attempt = time.monotonic() + self.ttl
+                else:
+                    self.last_error = error
+                    self.next_attempt = time.monotonic() + self.retry
+                self.refreshing = False
+                self.fetched.notify_all()
+
+    def snapshot(self) -> RateSnapshot:
+        with self.lock:
+            current = self.current
+            due = not self.refreshing and time.monotonic() >= self.next_attempt
+            if due:
+                self.refreshing = True
+        if current is None:
+            if due:
+                self._refresh()
+            with self.fetched:
+                # Cold start: wait for a fetch another request already has in flight
+                self.fetched.wait_for(lambda: not self.refreshing, timeout=15)
+                if self.current is None:
+                    raise RatesUnavailable(self.last_error or "rates are being fetched")
+                return self.current
+        if due:
+            threading.Thread(target=self._refresh, name="rate-refresh", daemon=True).start()
+        return current
+
+    def is_stale(self, snapshot: RateSnapshot) -> bool:
+        return time.time() - snapshot.fetched_at > self.ttl
+
+
+rate_provider = RateProvider(EXCHANGE_RATE_URL, EXCHANGE_RATE_BASE, EXCHANGE_RATE_TTL, EXCHANGE_RATE_RETRY)
+
+
 @app.post("/api/currency")
 def api_currency():
     try:
@@ -1041,13 +3053,106 @@ def api_currency():
     except Exception:
         return jsonify({"error": "Invalid input"}), 400
     try:
-        r = requests.get("https://api.exchangerate.host/convert", params={"from": from_cur, "to": to_cur, "amount": amount}, timeout=15)
-        j = r.json()
-        if not r.ok or "result" not in j:
-            return jsonify({"error": "Rate lookup failed"}), 502
-        return jsonify({"amount": amount, "from": from_cur, "to": to_cur, "converted": j["result"]})
-    except Exception:
+        snapshot = rate_provider.snapshot()
+    except RatesUnavailable:
         return jsonify({"error": "Conversion service unreachable"}), 502
+    try:
+        rate = snapshot.rate(from_cur, to_cur)
+    except KeyError as e:
+        return jsonify({"error": f"Unsupported currency: {e.args[0]}"}), 400
+    return jsonify({
+        "amount": amount,
+        "from": from_cur,
+        "to": to_cur,
+        "converted": amount * rate,
+        "rate": rate,
+        "ratesTimestamp": snapshot.timestamp(),
+        "stale": rate_provider.is_stale(snapshot),
+    })
+
+
+CURRENCY_BATCH_MAX = int(os.getenv("CURRENCY_BATCH_MAX", 100_000))
+
+
+def convert_batch(snapshot: RateSnapshot, rows) -> list[dict]:
+    """Convert (amount, from, to) rows against one snapshot, reporting bad rows inline."""
+    pair_rates = {}
+    results = []
+    for amount, from_cur, to_cur in rows:
+        from_cur = str(from_cur or "").upper().strip()
+        to_cur = str(to_cur or "").upper().strip()
+        result = {"amount": amount, "from": from_cur, "to": to_cur}
+        try:
+            amount = result["amount"] = float(amount)
+            if not math.isfinite(amount):
+                raise ValueError(amount)
+        except (TypeError, ValueError):
+            result["error"] = "Invalid amount"
+            results.append(result)
+            continue
+        # Cross rates are shared by every row with the same pair
+        rate = pair_rates.get((from_cur, to_cur))
+        if rate is None:
+            try:
+                rate = pair_rates[(from_cur, to_cur)] = snapshot.rate(from_cur, to_cur)
+            except KeyError as e:
+                result["error"] = f"Unsupported currency: {e.args[0]}"
+                results.append(result)
+                continue
+        result["rate"] = rate
+        result["converted"] = amount * rate
+        results.append(result)
+    return results
+
+
+@app.post("/api/currency/batch")
+def api_currency_batch():
+    """Convert many amounts at once. Accepts JSON {"items": [...]} or a CSV of amount,from,to."""
+    upload = request.files.get("file")
+    if upload:
+        reader = csv.reader(io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline=""))
+        rows = [(row + ["", ""])[:3] for row in reader if row and any(cell.strip() for cell in row)]
+        if rows and rows[0][0].strip().lower() == "amount":
+            rows = rows[1:]
+    else:
+        data = request.get_json(force=True, silent=True)
+        items = data.get("items") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            return jsonify({"error": "items must be a list of {amount, from, to} objects or [amount, from, to] triples"}), 400
+        rows = []
+        for item in items:
+            if isinstance(item, dict):
+                rows.append((item.get("amount"), item.get("from"), item.get("to")))
+            elif isinstance(item, list) and len(item) == 3:
+                rows.append(tuple(item))
+            else:
+                rows.append((None, None, None))
+    if not rows:
+        return jsonify({"error": "No conversions provided"}), 400
+    if len(rows) > CURRENCY_BATCH_MAX:
+        return jsonify({"error": f"At most {CURRENCY_BATCH_MAX} conversions per batch"}), 413
+    try:
+        snapshot = rate_provider.snapshot()
+    except RatesUnavailable:
+        return jsonify({"error": "Conversion service unreachable"}), 502
+    results = convert_batch(snapshot, rows)
+    if upload:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["amount", "from", "to", "rate", "converted", "error"])
+        writer.writerows(
+            [r["amount"], r["from"], r["to"], r.get("rate", ""), r.get("converted", ""), r.get("error", "")]
+            for r in results
+        )
+        response = send_file(io.BytesIO(out.getvalue().encode("utf-8")), mimetype="text/csv", as_attachment=True, download_name="conversions.csv")
+        response.headers["X-Rates-Timestamp"] = snapshot.timestamp()
+        return response
+    return jsonify({
+        "results": results,
+        "ratesTimestamp": snapshot.timestamp(),
+        "stale": rate_provider.is_stale(snapshot),
+        "errors": sum("error" in r for r in results),
+    })
 
 
 # ------------------------ Screen Recorder (Web) ------------------
@@ -1064,20 +3169,247 @@ def grammar_page():
     return render_template("grammar.html", current_user=current_user)
 
 
+SPELLCHECK_LANGUAGES = SpellChecker.languages() if SpellChecker is not None else []
+_spell_checkers = {}
+_spell_checkers_lock = threading.Lock()
+
+
+def get_spell_checker(language: str = "en"):
+    """Return the process-wide checker for `language`, loading its dictionary once."""
+    checker = _spell_checkers.get(language)
+    if checker is None:
+        with _spell_checkers_lock:
+            checker = _spell_checkers.get(language)
+            if checker is None:
+                checker = SpellChecker(language=language)
+                _spell_checkers[language] = checker
+    return checker
+
+
+SUGGEST_MAX_DISTANCE = 2
+SUGGEST_PREFIX_LENGTH = 7
+SUGGEST_MAX_WORDS = int(os.getenv("SUGGEST_MAX_WORDS", 60_000))
+_suggestion_indexes = {}
+_suggestion_indexes_lock = threading.Lock()
+suggestion_cache = TTLCache(int(os.getenv("SUGGESTION_CACHE_SIZE", 50_000)), 86400)
+
+
+def _deletes(word: str, max_distance: int) -> set:
+    found = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal-string-alignment distance, or limit + 1 once it is known to exceed `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class SuggestionIndex:
+    """Symmetric-deletion (SymSpell-style) index over the most frequent dictionary words.
+
+    Deletes of each word's prefix are precomputed, so a lookup only generates
+    deletes of the typo and verifies the few words sharing one of them.
+    """
+
+    def __init__(self, frequencies: dict, max_words: int):
+        self.words = sorted(frequencies, key=lambda w: -frequencies[w])[:max_words]
+        self.frequencies = [frequencies[w] for w in self.words]
+        self.deletes = {}
+        for index, word in enumerate(self.words):
+            for d in _deletes(word[:SUGGEST_PREFIX_LENGTH], SUGGEST_MAX_DISTANCE):
+                entry = self.deletes.get(d)
+                # Most deletes map to a single word; only promote to a list when shared
+                if entry is None:
+                    self.deletes[d] = index
+                elif isinstance(entry, int):
+                    self.deletes[d] = [entry, index]
+                else:
+                    entry.append(index)
+
+    def lookup(self, word: str, limit: int = 5) -> list[str]:
+        word = word.lower()
+        seen = set()
+        for d in _deletes(word[:SUGGEST_PREFIX_LENGTH], SUGGEST_MAX_DISTANCE):
+            entry = self.deletes.get(d)
+            if entry is not None:
+                seen.update((entry,) if isinstance(entry, int) else entry)
+        ranked = []
+        for index in seen:
+            distance = edit_distance(word, self.words[index], SUGGEST_MAX_DISTANCE)
+            if distance <= SUGGEST_MAX_DISTANCE:
+                ranked.append((distance, -self.frequencies[index], self.words[index]))
+        ranked.sort()
+        return [w for _, _, w in ranked[:limit]]
+
+
+def get_suggestion_index(language: str = "en") -> SuggestionIndex:
+    index = _suggestion_indexes.get(language)
+    if index is None:
+        with _suggestion_indexes_lock:
+            index = _suggestion_indexes.get(language)
+            if index is None:
+                frequencies = get_spell_checker(language).word_frequency.dictionary
+                index = SuggestionIndex(frequencies, SUGGEST_MAX_WORDS)
+                _suggestion_indexes[language] = index
+    return index
+
+
+def suggest(language: str, word: str) -> list[str]:
+    key = (language, word.lower())
+    suggestions = suggestion_cache.get(key)
+    if suggestions is None:
+        suggestions = get_suggestion_index(language).lookup(word)
+        suggestion_cache.set(key, suggestions)
+    return suggestions
+
+
+def preload_spell_checkers() -> None:
+    # Under `gunicorn --preload` this runs in the master, so workers share the pages copy-on-write
+    for language in os.getenv("SPELLCHECK_PRELOAD", "en").split(","):
+        if language.strip() in SPELLCHECK_LANGUAGES:
+            get_spell_checker(language.strip())
+            get_suggestion_index(language.strip())
+
+
+GRAMMAR_MAX_CHARS = int(os.getenv("GRAMMAR_MAX_CHARS", 2_000_000))
+GRAMMAR_MAX_DISTINCT_WORDS = int(os.getenv("GRAMMAR_MAX_DISTINCT_WORDS", 50_000))
+WORD_RE = re.compile(r"[^\W\d_]+(?:['\u2019][^\W\d_]+)*")
+
+
+def iter_upload_text(upload):
+    """Yield an uploaded .txt or .docx file as text chunks without loading it whole."""
+    if (upload.filename or "").lower().endswith(".docx"):
+        for paragraph in docx.Document(upload.stream).paragraphs:
+            yield paragraph.text + "\n"
+        return
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for block in iter(lambda: upload.stream.read(64 * 1024), b""):
+        yield decoder.decode(block)
+    yield decoder.decode(b"", final=True)
+
+
+def index_words(chunks, max_chars: int, max_distinct: int) -> tuple[dict, int, bool]:
+    """Map each distinct lowercased word to its character offsets.
+
+    Returns (occurrences, characters scanned, truncated). A word that straddles
+    two chunks is carried into the next one; scanning stops at either cap.
+    """
+    occurrences = {}
+    base = 0
+    pending = ""
+    truncated = False
+    for chunk in itertools.chain(chunks, [None]):
+        final = chunk is None
+        if not final:
+            pending += chunk
+            if base + len(pending) > max_chars:
+                pending = pending[:max_chars - base]
+                truncated = final = True
+        consumed = len(pending)
+        for m in WORD_RE.finditer(pending):
+            if m.end() == len(pending) and (not final or truncated):
+                # Possibly cut off mid-word: defer it, or drop it at the cap
+                consumed = m.start()
+                break
+            word = m.group().lower()
+            positions = occurrences.get(word)
+            if positions is None:
+                if len(occurrences) >= max_distinct:
+                    return occurrences, base + m.start(), True
+                positions = occurrences[word] = []
+            positions.append(base + m.start())
+        base += consumed
+        pending = pending[consumed:]
+        if final:
+            break
+    return occurrences, base, truncated
+
+
 @app.post("/api/grammar")
 def api_grammar():
-    text = request.get_json(force=True).get("text", "")
-    if not text:
-        return jsonify({"errors": []})
+    upload = request.files.get("file")
+    if upload:
+        data = request.form
+        if upload.filename.lower().endswith(".docx") and docx is None:
+            return jsonify({"error": "python-docx required for .docx files"}), 500
+        chunks = iter_upload_text(upload)
+    else:
+        data = request.get_json(force=True)
+        chunks = [data.get("text", "")]
+    language = str(data.get("language", "en")).lower()
+    if SpellChecker is not None and language not in SPELLCHECK_LANGUAGES:
+        return jsonify({"error": f"language must be one of: {', '.join(SPELLCHECK_LANGUAGES)}"}), 400
     results = []
-    if SpellChecker is not None:
-        sp = SpellChecker()
-        words = [w.strip(".,!?;:\"'()[]{}") for w in text.split()]
-        misspelled = sp.unknown([w for w in words if w])
-        for w in misspelled:
-            suggestions = list(sp.candidates(w))[:5]
-            results.append({"word": w, "suggestions": suggestions})
-    return jsonify({"errors": results})
+    try:
+        occurrences, checked, truncated = index_words(chunks, GRAMMAR_MAX_CHARS, GRAMMAR_MAX_DISTINCT_WORDS)
+    except (ValueError, KeyError, zipfile.BadZipFile):
+        return jsonify({"error": "Could not read the uploaded document"}), 400
+    if SpellChecker is not None and occurrences:
+        sp = get_spell_checker(language)
+        # Each distinct word is checked once, however often it occurs
+        for word in sorted(sp.unknown(occurrences), key=lambda w: occurrences[w][0]):
+            results.append({"word": word, "suggestions": suggest(language, word), "offsets": occurrences[word]})
+    return jsonify({"errors": results, "checkedChars": checked, "truncated": truncated})
+
+
+@app.cli.command("bench-spelling")
+@click.option("--words", default=1000, show_default=True, help="Typos in the generated corpus.")
+@click.option("--seed", default=7, show_default=True)
+def bench_spelling(words: int, seed: int):
+    """Compare SpellChecker.candidates() with the deletion index on synthetic typos."""
+    import random
+    rng = random.Random(seed)
+    sp = get_spell_checker("en")
+    started = time.perf_counter()
+    index = SuggestionIndex(sp.word_frequency.dictionary, SUGGEST_MAX_WORDS)
+    click.echo(f"Index build: {time.perf_counter() - started:.1f}s for {len(index.words):,} words, {len(index.deletes):,} deletes")
+    # Typos of common words: mostly one edit, some two, in the proportions seen in typing studies
+    pool = [w for w in index.words[500:20000] if len(w) >= 4 and w.isalpha()]
+    letters = string.ascii_lowercase
+    corpus = []
+    while len(corpus) < words:
+        target = rng.choice(pool)
+        typo = target
+        for _ in range(1 if rng.random() < 0.8 else 2):
+            i = rng.randrange(len(typo))
+            op = rng.choice("dist")
+            if op == "d":
+                typo = typo[:i] + typo[i + 1:]
+            elif op == "i":
+                typo = typo[:i] + rng.choice(letters) + typo[i:]
+            elif op == "s":
+                typo = typo[:i] + rng.choice(letters) + typo[i + 1:]
+            elif i < len(typo) - 1:
+                typo = typo[:i] + typo[i + 1] + typo[i] + typo[i + 2:]
+        if typo and typo not in sp:
+            corpus.append((typo, target))
+
+    for name, fn in (
+        ("candidates()", lambda w: sorted(sp.candidates(w) or [], key=lambda c: -sp.word_usage_frequency(c))),
+        ("deletion index", index.lookup),
+    ):
+        started = time.perf_counter()
+        top1 = sum(1 for typo, target in corpus if (fn(typo) or [None])[0] == target)
+        elapsed = time.perf_counter() - started
+        click.echo(f"{name:>15}: {elapsed / len(corpus) * 1000:8.3f} ms/word, top-1 {top1 / len(corpus):.1%}")
 
 
 # ------------------------ Footer Links -------------------------
@@ -1099,6 +3431,13 @@ def terms_page():
     return render_template("terms.html", current_user=current_user)
 
 
+# Runs on import so gunicorn workers (and a --preload master) get the schema too
+init_db()
+if SpellChecker is not None:
+    preload_spell_checkers()
+    # Keep the collector from touching preloaded objects so forked workers don't copy their pages
+    gc.freeze()
+
+
 if __name__ == "__main__":
-    init_db()
     app.run(debug=True)
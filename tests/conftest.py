@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Importing app connects to MongoDB and preloads dictionaries; keep both quick offline
+os.environ.setdefault("MONGODB_URI", "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=200")
+os.environ.setdefault("SPELLCHECK_PRELOAD", "")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
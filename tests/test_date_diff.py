@@ -0,0 +1,74 @@
+import io
+import random
+from datetime import date
+
+import pytest
+
+import app as toolflock
+from app import date_diff_row, difference_ymd, months_and_extra_days
+
+
+def scalar_row(start, end):
+    return difference_ymd(start, end) + months_and_extra_days(start, end) + ((end - start).days,)
+
+
+def month_ends():
+    for year in (1900, 1999, 2000, 2023, 2024):
+        for month in range(1, 13):
+            yield date(year, month, toolflock._days_in_month(year, month))
+
+
+def random_pairs(n, seed):
+    rng = random.Random(seed)
+    lo, hi = date(1900, 1, 1).toordinal(), date(2100, 12, 31).toordinal()
+    ends = [d.toordinal() for d in month_ends()]
+    for _ in range(n):
+        a = rng.choice(ends) if rng.random() < 0.3 else rng.randint(lo, hi)
+        b = a + rng.randint(0, 62) if rng.random() < 0.4 else rng.randint(lo, hi)
+        yield tuple(sorted((date.fromordinal(a), date.fromordinal(b))))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_date_diff_row_matches_scalar_functions(seed):
+    for start, end in random_pairs(20_000, seed):
+        assert date_diff_row(start, end) == scalar_row(start, end), (start, end)
+
+
+def test_date_diff_row_matches_on_every_month_end_pair():
+    ends = list(month_ends())
+    for start in ends:
+        for end in ends:
+            if start <= end:
+                assert date_diff_row(start, end) == scalar_row(start, end), (start, end)
+
+
+@pytest.fixture
+def client():
+    return toolflock.app.test_client()
+
+
+def post_csv(client, body, **form):
+    data = {"file": (io.BytesIO(body.encode()), "roster.csv"), **form}
+    return client.post("/api/diff/batch", data=data)
+
+
+def test_batch_csv_reports_bad_first_row_instead_of_treating_it_as_header(client):
+    res = post_csv(client, "2020-02-30,2021-01-01\n2020-01-31,2020-03-01\n")
+    lines = res.data.decode().splitlines()
+    assert lines[0].startswith("column_1,column_2,years")
+    assert lines[1].startswith("2020-02-30,2021-01-01,,,,,,,Invalid input")
+    assert lines[2] == "2020-01-31,2020-03-01,0,1,-1,1,1,30,"
+
+
+def test_batch_csv_detects_named_header_and_columns(client):
+    res = post_csv(client, "emp,hired,left\nA1,2019-05-31,2024-02-29\n", startColumn="hired", endColumn="left")
+    lines = res.data.decode().splitlines()
+    assert lines[0] == "emp,hired,left,years,months,days,total_months,extra_days,total_days,error"
+    assert lines[1] == "A1,2019-05-31,2024-02-29,4,8,29,56,29,1735,"
+
+
+def test_batch_csv_explicit_header_flag(client):
+    res = post_csv(client, "2020-01-01,2020-02-01\n2020-01-01,2020-03-01\n", header="1")
+    lines = res.data.decode().splitlines()
+    assert lines[0].startswith("2020-01-01,2020-02-01,years")
+    assert len(lines) == 2